@@ -49,7 +49,11 @@ try:
 except ImportError:
     TQDM_AVAILABLE = False
 
-from scripts.utils.runtime import configure_stdio
+from scripts.utils.runtime import (
+    configure_stdio,
+    exit_on_termination_signals,
+    terminate_process,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -187,6 +191,11 @@ class BayesianOptimizer:
         # Concurrency control (can be modified before calling optimize)
         self.max_workers = 1
         self._lock = threading.Lock()
+        # Running pipeline children, so an interrupt of a parallel run can
+        # stop them (they are started in their own sessions)
+        self._live_procs = set()
+        self._procs_lock = threading.Lock()
+        self._stopping = False
 
         # Create output directories
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -448,26 +457,39 @@ class BayesianOptimizer:
                     stderr=subprocess.PIPE,
                     text=True,
                     env=env,
+                    start_new_session=True,
                 )
+                with self._procs_lock:
+                    self._live_procs.add(result)
+                    stopping = self._stopping
+                if stopping:
+                    # Started after an interrupt was handled; do not run it
+                    terminate_process(result)
 
-                # Show spinner while process is running (only if not in quiet mode)
-                if show_spinner:
-                    while result.poll() is None:
-                        sys.stderr.write(
-                            f"\r  {spinner_chars[spinner_idx % len(spinner_chars)]} Running... "
-                        )
-                        sys.stderr.flush()
-                        spinner_idx += 1
-                        import time
+                try:
+                    # Show spinner while process is running (only if not in quiet mode)
+                    if show_spinner:
+                        while result.poll() is None:
+                            sys.stderr.write(
+                                f"\r  {spinner_chars[spinner_idx % len(spinner_chars)]} Running... "
+                            )
+                            sys.stderr.flush()
+                            spinner_idx += 1
+                            import time
 
-                        time.sleep(0.1)
-                    sys.stderr.write("\r   Complete\n")
-                    sys.stderr.flush()
-                else:
-                    result.wait()  # Wait for completion without spinner
+                            time.sleep(0.1)
+                        sys.stderr.write("\r   Complete\n")
+                        sys.stderr.flush()
+                    else:
+                        result.wait()  # Wait for completion without spinner
 
-                # Get final output
-                stdout, stderr = result.communicate()
+                    # Get final output
+                    stdout, stderr = result.communicate()
+                finally:
+                    # Stop the pipeline (and DSI Studio) if we were interrupted
+                    terminate_process(result)
+                    with self._procs_lock:
+                        self._live_procs.discard(result)
 
                 return result.returncode, stdout, stderr
 
@@ -850,37 +872,41 @@ class BayesianOptimizer:
                 return self._evaluate_params(x, iter_num)
 
             try:
-                futures_map = {}  # Map future -> x for tracking
-
-                while len(self.iteration_results) < self.n_iterations:
-                    # Ask for new points (up to max_workers at a time)
-                    points_to_evaluate = []
-                    for _ in range(
-                        min(
-                            self.max_workers,
-                            self.n_iterations - len(self.iteration_results),
-                        )
-                    ):
-                        x = opt.ask()
-                        points_to_evaluate.append(x)
-
-                    # Submit evaluations
-                    for x in points_to_evaluate:
-                        future = executor.submit(evaluate_with_iteration, x)
-                        futures_map[future] = x
-
-                    # Collect results and tell optimizer
-                    for future in concurrent.futures.as_completed(futures_map.keys()):
-                        x = futures_map[future]
+                n_dispatched = 0
+                while n_dispatched < self.n_iterations:
+                    # Ask for a batch of distinct points (constant-liar strategy)
+                    n_points = min(self.max_workers, self.n_iterations - n_dispatched)
+                    points_to_evaluate = opt.ask(n_points=n_points)
+                    n_dispatched += n_points
+
+                    # Evaluate the batch concurrently
+                    futures = [
+                        executor.submit(evaluate_with_iteration, x)
+                        for x in points_to_evaluate
+                    ]
+                    y_batch = []
+                    for future in futures:
                         try:
-                            y = future.result()
-                            opt.tell(x, y)
+                            y_batch.append(future.result())
                         except Exception as e:
                             logger.error(f" Evaluation failed: {e}")
-                            opt.tell(x, 0.0)  # Tell optimizer the evaluation failed
-                        finally:
-                            del futures_map[future]
-
+                            y_batch.append(0.0)  # Tell optimizer the evaluation failed
+
+                    # Single tell for the whole batch refits the surrogate once
+                    opt.tell(points_to_evaluate, y_batch)
+
+            except (KeyboardInterrupt, SystemExit):
+                # Ctrl-C and SIGTERM only reach this thread; the children the
+                # workers wait on are in their own sessions, so stop them here
+                # or the shutdown below would wait for them to finish
+                logger.info("  Optimization interrupted, stopping running pipelines")
+                with self._procs_lock:
+                    self._stopping = True
+                    live = list(self._live_procs)
+                for proc in live:
+                    terminate_process(proc)
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
             finally:
                 executor.shutdown(wait=True)
 
@@ -1185,6 +1211,7 @@ Bayesian optimization is much more efficient than grid search:
     args = parser.parse_args()
 
     configure_stdio(args.no_emoji)
+    exit_on_termination_signals()
 
     # Check if scikit-optimize is available
     if not SKOPT_AVAILABLE:
@@ -14,14 +14,21 @@ import os
 import sys
 import subprocess
 import argparse
+import contextlib
+import csv
+import fnmatch
+import functools
 import logging
+import multiprocessing
+import queue
 import time
+import traceback
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import random
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from scripts.utils.runtime import configure_stdio
 from scripts.sweep_utils import (
     build_param_grid_from_config,
@@ -29,6 +36,7 @@ from scripts.sweep_utils import (
     random_sampling as sweep_random_sampling,
     lhs_sampling,
     apply_param_choice_to_config,
+    write_sweep_manifest,
 )
 
 
@@ -66,6 +74,25 @@ def repo_root() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
+def write_json_if_changed(path: Path, data: dict) -> bool:
+    """Write ``data`` as indented JSON only if the file content would change.
+
+    Unchanged files keep their mtime; changed files are replaced atomically.
+    Returns True when the file was written.
+    """
+    path = Path(path)
+    new_bytes = json.dumps(data, indent=2).encode("utf-8")
+    try:
+        if path.read_bytes() == new_bytes:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(new_bytes)
+    os.replace(tmp, path)
+    return True
+
+
 def generate_wave_configs(
     data_dir, output_dir, n_subjects: int = 3, extraction_cfg: str | None = None
 ):
@@ -133,10 +160,8 @@ def generate_wave_configs(
     wave1_path = configs_dir / "wave1_config.json"
     wave2_path = configs_dir / "wave2_config.json"
 
-    with open(wave1_path, "w") as f:
-        json.dump(wave1_config, f, indent=2)
-    with open(wave2_path, "w") as f:
-        json.dump(wave2_config, f, indent=2)
+    write_json_if_changed(wave1_path, wave1_config)
+    write_json_if_changed(wave2_path, wave2_config)
 
     logging.info(f" Generated wave configurations in {configs_dir}")
 
@@ -188,28 +213,568 @@ def generate_single_wave_config(
     # Save configuration
     wave_path = configs_dir / "comprehensive_wave.json"
 
-    with open(wave_path, "w") as f:
-        json.dump(wave_config, f, indent=2)
+    write_json_if_changed(wave_path, wave_config)
 
     logging.info(f" Generated single comprehensive wave configuration in {configs_dir}")
 
     return str(wave_path)
 
 
+def _run_logged(cmd: list[str], log_path: Path, env: dict | None = None):
+    """Run a command with stdout/stderr written straight to ``log_path``.
+
+    Output never passes through Python; only the last 4000 bytes are read
+    back when the command fails. Returns a CompletedProcess with that tail
+    as stdout.
+    """
+    with open(log_path, "wb", buffering=1 << 16) as lf:
+        rc = subprocess.call(cmd, stdout=lf, stderr=subprocess.STDOUT, env=env)
+    tail = _log_tail(log_path) if rc != 0 else ""
+    return subprocess.CompletedProcess(cmd, rc, tail, "")
+
+
+def _run_inprocess(func, log_path: Path, logger_name: str, *args):
+    """Call a pipeline step function in this interpreter, logging to ``log_path``.
+
+    Saves an interpreter start-up and the pandas/scipy imports per call.
+    The step's prints and its module logger are routed to the log file
+    only. Returns a CompletedProcess mirroring ``_run_logged``.
+    """
+    step_logger = logging.getLogger(logger_name)
+    with open(log_path, "w", encoding="utf-8", errors="replace") as lf:
+        handler = logging.StreamHandler(lf)
+        handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
+        saved = (step_logger.propagate, step_logger.level)
+        step_logger.addHandler(handler)
+        step_logger.propagate = False
+        step_logger.setLevel(logging.INFO)
+        try:
+            with contextlib.redirect_stdout(lf), contextlib.redirect_stderr(lf):
+                result = func(*args)
+            # Step functions return an exit code or a success flag
+            rc = int(result) if not isinstance(result, bool) else int(not result)
+        except Exception:
+            traceback.print_exc(file=lf)
+            rc = 1
+        finally:
+            step_logger.removeHandler(handler)
+            step_logger.propagate, level = saved
+            step_logger.setLevel(level)
+    tail = _log_tail(log_path) if rc != 0 else ""
+    return subprocess.CompletedProcess([func.__name__], rc, tail, "")
+
+
+def _log_tail(log_path: Path, n_bytes: int = 4000) -> str:
+    """Return the last ``n_bytes`` of a log file without reading all of it."""
+    try:
+        with open(log_path, "rb") as lf:
+            lf.seek(0, os.SEEK_END)
+            lf.seek(max(0, lf.tell() - n_bytes))
+            return lf.read().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def _iter_candidates(root, pattern: str = "*.fz"):
+    """Yield files under ``root`` matching ``pattern`` or ending in .fib.gz.
+
+    One ``os.walk`` pass replaces a separate recursive glob per pattern.
+    """
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(".fib.gz") or fnmatch.fnmatch(name, pattern):
+                yield os.path.join(dirpath, name)
+
+
+# Order in which sweep parameters are echoed; others follow alphabetically
+_PARAM_ORDER = {
+    k: i
+    for i, k in enumerate(
+        [
+            "tract_count",
+            "connectivity_threshold",
+            "otsu_threshold",
+            "fa_threshold",
+            "min_length",
+            "max_length",
+            "track_voxel_ratio",
+            "turning_angle",
+            "step_size",
+            "smoothing",
+            "dt_threshold",
+        ]
+    )
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_choice_cached(items: tuple) -> str:
+    ordered = sorted(items, key=lambda kv: (_PARAM_ORDER.get(kv[0], 999), kv[0]))
+    return ", ".join(f"{k}={v}" for k, v in ordered)
+
+
+def fmt_choice(c: dict) -> str:
+    """Format a parameter choice as ``k=v`` pairs in a stable order."""
+    return _fmt_choice_cached(tuple(c.items()))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_extraction_config(path: str, mtime_ns: int) -> dict:
+    """Parse an extraction config once per (path, mtime).
+
+    Both waves usually share the same extraction config. Callers must treat
+    the returned dict as read-only; derived configs are built with
+    ``apply_param_choice_to_config``, which never modifies its base.
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
 def load_wave_config(config_file):
     """Load wave configuration."""
     with open(config_file, "r") as f:
         return json.load(f)
 
 
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _cpu_slots(max_parallel: int) -> list[set[int]]:
+    """Split the usable CPUs into ``max_parallel`` disjoint sets.
+
+    Returns an empty list where affinity is unsupported (non-Linux) or there
+    are fewer CPUs than parallel combos.
+    """
+    if max_parallel <= 1 or not hasattr(os, "sched_getaffinity"):
+        return []
+    cpus = sorted(os.sched_getaffinity(0))
+    per_combo = len(cpus) // max_parallel
+    if per_combo < 1:
+        return []
+    return [set(cpus[k * per_combo : (k + 1) * per_combo]) for k in range(max_parallel)]
+
+
+def _combo_mp_context():
+    """Multiprocessing context for the parallel combo workers.
+
+    forkserver where available: fork-like worker start-up without forking
+    this (threaded) parent, with the step modules preloaded once in the
+    server so each worker inherits them already imported. The preload only
+    takes effect before the server starts, so ``main()`` builds this once and
+    hands it to every wave.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    mp_ctx = multiprocessing.get_context("forkserver")
+    mp_ctx.set_forkserver_preload(
+        [
+            "__main__",
+            "scripts.aggregate_network_measures",
+            "scripts.metric_optimizer",
+        ]
+    )
+    return mp_ctx
+
+
+def _init_worker(slot_queue=None, n_threads: int | None = None):
+    """Prepare a combo worker process.
+
+    Imports the in-process step modules up front (workers persist across
+    combos, so pandas/scipy load once per worker). When a CPU slot queue is
+    given, the worker pins itself to one disjoint CPU set; the DSI Studio
+    children it spawns inherit that affinity. numpy is already imported by the
+    time this runs, so the thread environment variables no longer apply to its
+    BLAS/OpenMP pools; they are resized to ``n_threads`` via threadpoolctl
+    (installed with scikit-learn) so parallel combos do not oversubscribe the
+    host.
+    """
+    from scripts import aggregate_network_measures, metric_optimizer  # noqa: F401
+
+    if n_threads:
+        try:
+            from threadpoolctl import threadpool_limits
+
+            threadpool_limits(n_threads)
+        except ImportError:
+            pass
+    if slot_queue is not None:
+        try:
+            os.sched_setaffinity(0, slot_queue.get(timeout=5))
+        except (queue.Empty, OSError):
+            pass
+
+
+SCORE_COLUMNS = ("quality_score_raw", "quality_score")
+DIAGNOSTIC_COLUMNS = (
+    "density",
+    "global_efficiency(weighted)",
+    "small-worldness(binary)",
+    "small-worldness(weighted)",
+)
+
+
+def _csv_column_means(path: Path, columns) -> dict:
+    """Single-pass means of numeric CSV columns using the stdlib csv module.
+
+    Blank, non-numeric and NaN cells are skipped; columns absent from the
+    header are omitted and columns without values map to NaN.
+    """
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        index = {col: header.index(col) for col in columns if col in header}
+        sums = dict.fromkeys(index, 0.0)
+        counts = dict.fromkeys(index, 0)
+        for row in reader:
+            for col, j in index.items():
+                try:
+                    v = float(row[j])
+                except (IndexError, ValueError):
+                    continue
+                if v == v:
+                    sums[col] += v
+                    counts[col] += 1
+    return {
+        col: (sums[col] / counts[col] if counts[col] else float("nan")) for col in index
+    }
+
+
+def _aggregate_diagnostics(agg_csv: Path) -> dict:
+    """Mean network measures of a combo, used for reporting only.
+
+    The small aggregated-measures CSV is averaged with the stdlib csv module
+    rather than building a DataFrame. Missing columns (or an unreadable CSV)
+    yield NaN entries.
+    """
+    nan = float("nan")
+    try:
+        means = _csv_column_means(agg_csv, DIAGNOSTIC_COLUMNS)
+    except Exception:
+        means = {}
+    return {
+        key: means.get(col, nan)
+        for key, col in (
+            ("density_mean", "density"),
+            ("global_efficiency_weighted_mean", "global_efficiency(weighted)"),
+            ("small_worldness_binary_mean", "small-worldness(binary)"),
+            ("small_worldness_weighted_mean", "small-worldness(weighted)"),
+        )
+    }
+
+
+def _score_opt_csvs(opt_csvs: dict) -> tuple[dict, dict]:
+    """Score all Step 02 outputs of a wave in one batched pass.
+
+    ``opt_csvs`` maps combo index to its optimized_metrics.csv. Only the score
+    columns are parsed; the frames are concatenated and reduced with a single
+    groupby. Returns ({index: (quality_score_raw_mean, quality_score_norm_max)},
+    {index: error}) where missing columns yield NaN.
+    """
+    frames = []
+    errors = {}
+    for i, opt_csv in opt_csvs.items():
+        try:
+            df = pd.read_csv(opt_csv, usecols=lambda c: c in SCORE_COLUMNS)
+        except Exception as e:
+            errors[i] = str(e)
+            continue
+        frames.append(df.assign(combo=i))
+    if not frames:
+        return {}, errors
+    big = pd.concat(frames, ignore_index=True)
+    for col in SCORE_COLUMNS:
+        big[col] = (
+            pd.to_numeric(big[col], errors="coerce") if col in big else float("nan")
+        )
+    # Reindex so combos whose CSV has no rows still score as NaN
+    agg = (
+        big.groupby("combo")
+        .agg(raw_mean=("quality_score_raw", "mean"), norm_max=("quality_score", "max"))
+        .reindex([i for i in opt_csvs if i not in errors])
+    )
+    scores = {
+        int(i): (float(raw_mean), float(norm_max))
+        for i, raw_mean, norm_max in agg.itertuples()
+    }
+    return scores, errors
+
+
+def _selection_score(raw_mean: float, norm_max: float) -> float:
+    """Selection scalar of a combo: raw mean, else normalized max, else -1."""
+    # Use absolute (raw) mean as primary selector to avoid trivial 1.0 normalization
+    if not np.isnan(raw_mean):
+        return raw_mean
+    return norm_max if not np.isnan(norm_max) else -1.0
+
+
+def _finish_combo(
+    i: int,
+    combo_out: Path,
+    opt_csv: Path,
+    aggregates: dict,
+    raw_mean: float,
+    norm_max: float,
+    *,
+    meta: dict,
+    manifest: Path,
+    wave_name: str,
+) -> tuple[float, str]:
+    """Persist diagnostics.json for a scored combo.
+
+    Returns (selection_score, diag) where diag is the human-readable summary.
+    """
+    score = _selection_score(raw_mean, norm_max)
+    # tract_count and sweep meta for tie-breakers and reporting
+    tract_count = int(meta.get("tract_count", -1))
+    thread_count = int(meta.get("thread_count", -1))
+    sweep_meta = meta.get("sweep_meta") or {}
+    dens = aggregates["density_mean"]
+    geff = aggregates["global_efficiency_weighted_mean"]
+
+    # Persist per-combo diagnostics JSON
+    try:
+        diag_json = {
+            "status": "ok",
+            "wave": wave_name,
+            "combo_dir": str(combo_out),
+            "sweep_manifest": str(manifest),
+            "sweep_index": i,
+            "combo_index": int(sweep_meta.get("index") or i),
+            "total_combinations": int(sweep_meta.get("total_combinations") or -1),
+            "sampler": sweep_meta.get("sampler"),
+            "parameters": sweep_meta.get("choice"),
+            "thread_count": thread_count,
+            "tract_count": tract_count,
+            "selection_score": float(score),
+            "quality_score_raw_mean": (
+                float(raw_mean) if not np.isnan(raw_mean) else None
+            ),
+            "quality_score_norm_max": (
+                float(norm_max) if not np.isnan(norm_max) else None
+            ),
+            "aggregates": {
+                key: None if np.isnan(val) else float(val)
+                for key, val in aggregates.items()
+            },
+            "files": {
+                "optimized_metrics_csv": str(opt_csv),
+                "aggregated_measures_csv": str(
+                    combo_out / "01_connectivity" / "aggregated_network_measures.csv"
+                ),
+            },
+        }
+        (combo_out / "diagnostics.json").write_text(json.dumps(diag_json, indent=2))
+    except Exception:
+        pass
+
+    # Human-readable summary for logs
+    diag = (
+        f"raw_mean={raw_mean:.3f} | max quality_score(norm)={norm_max:.3f}"
+        f" | tract_count={tract_count}"
+    )
+    extra_bits = []
+    if not np.isnan(dens):
+        extra_bits.append(f"density_mean={dens:.4f}")
+    if not np.isnan(geff):
+        extra_bits.append(f"geff_w_mean={geff:.4f}")
+    if extra_bits:
+        diag += " | " + " ".join(extra_bits)
+    return score, diag
+
+
+def run_combo(
+    i: int,
+    manifest: Path,
+    combo_out: Path,
+    verbose: bool = False,
+    *,
+    root: Path,
+    staging_dir: Path,
+    wave_name: str,
+    subject_list: Path | None = None,
+    env: dict | None = None,
+) -> tuple[int, Path, dict, str, list[str]]:
+    """Run step01+aggregate+step02 for a single combination.
+
+    Module-level so it can run in a worker process; it does no logging itself.
+    Step 01 reads its config from entry ``i`` of the sweep ``manifest``.
+    Scoring of the optimized CSV is left to the parent, which batches it
+    across the wave (see ``_score_opt_csvs``). ``env`` is the Step 01 child
+    environment, built once per wave by the caller.
+    Returns (i, optimized_csv_path, aggregates, status, log_lines) where
+    aggregates are the mean network measures and log_lines are messages for
+    the parent to log.
+    """
+    log_lines: list[str] = []
+    # Step 01
+    cmd01 = [
+        sys.executable,
+        "-u",
+        str(root / "scripts" / "run_pipeline.py"),
+        "--data-dir",
+        str(staging_dir),
+        "--step",
+        "01",
+        "--output",
+        str(combo_out),
+        "--sweep-manifest",
+        str(manifest),
+        "--sweep-index",
+        str(i),
+    ]
+    if subject_list is not None:
+        cmd01 += ["--subject-list", str(subject_list)]
+    # Child output streams to per-step log files; only the tail is kept on failure
+    step01_log = combo_out / "step01.log"
+    p1 = _run_logged(cmd01, step01_log, env=env)
+    # If verbose, print DSI Studio command from step01 output
+    if verbose:
+        with open(step01_log, "r", errors="replace") as lf:
+            for line in lf:
+                if "DSI Studio command:" in line:
+                    log_lines.append(f"[VERBOSE] {line.rstrip()}")
+    if p1.returncode != 0:
+        # Persist failure diagnostics for this combo
+        try:
+            fail_diag = {
+                "status": "failed",
+                "stage": "step01",
+                "wave": wave_name,
+                "combo_dir": str(combo_out),
+                "sweep_manifest": str(manifest),
+                "sweep_index": i,
+                "return_code": p1.returncode,
+                "stdout_tail": p1.stdout[-4000:] if p1.stdout else "",
+                "stderr_tail": p1.stderr[-4000:] if p1.stderr else "",
+            }
+            (combo_out / "diagnostics.json").write_text(json.dumps(fail_diag, indent=2))
+        except Exception:
+            pass
+        return (
+            i,
+            Path(""),
+            {},
+            f"step01_failed: rc={p1.returncode}\n{p1.stdout[-4000:]}\n{p1.stderr[-4000:] if p1.stderr else ''}",
+            log_lines,
+        )
+
+    # Aggregate measures
+    agg_csv = combo_out / "01_connectivity" / "aggregated_network_measures.csv"
+    if not agg_csv.exists():
+        # Pure-Python steps run in-process; only Step 01 (DSI Studio) is spawned
+        from scripts import aggregate_network_measures
+
+        pAgg = _run_inprocess(
+            aggregate_network_measures.aggregate_network_measures,
+            combo_out / "aggregate.log",
+            aggregate_network_measures.__name__,
+            str(combo_out / "01_connectivity"),
+            str(agg_csv),
+        )
+        if pAgg.returncode != 0 or not agg_csv.exists():
+            # Persist failure diagnostics for this combo
+            try:
+                fail_diag = {
+                    "status": "failed",
+                    "stage": "aggregate",
+                    "wave": wave_name,
+                    "combo_dir": str(combo_out),
+                    "sweep_manifest": str(manifest),
+                    "sweep_index": i,
+                    "return_code": pAgg.returncode,
+                    "stdout_tail": pAgg.stdout[-4000:] if pAgg.stdout else "",
+                    "stderr_tail": pAgg.stderr[-4000:] if pAgg.stderr else "",
+                }
+                (combo_out / "diagnostics.json").write_text(
+                    json.dumps(fail_diag, indent=2)
+                )
+            except Exception:
+                pass
+            return (
+                i,
+                Path(""),
+                {},
+                f"aggregate_failed: rc={pAgg.returncode}\n{pAgg.stdout[-4000:]}\n{pAgg.stderr[-4000:] if pAgg.stderr else ''}",
+                log_lines,
+            )
+
+    # Step 02
+    step02_dir = combo_out / "02_optimization"
+    step02_dir.mkdir(exist_ok=True)
+    from scripts import metric_optimizer
+
+    p2 = _run_inprocess(
+        metric_optimizer.run,
+        combo_out / "step02.log",
+        metric_optimizer.__name__,
+        str(agg_csv),
+        str(step02_dir),
+    )
+    opt_csv = step02_dir / "optimized_metrics.csv"
+    if p2.returncode != 0 or not opt_csv.exists():
+        # Persist failure diagnostics for this combo
+        try:
+            fail_diag = {
+                "status": "failed",
+                "stage": "step02",
+                "wave": wave_name,
+                "combo_dir": str(combo_out),
+                "sweep_manifest": str(manifest),
+                "sweep_index": i,
+                "return_code": p2.returncode,
+                "stdout_tail": p2.stdout[-4000:] if p2.stdout else "",
+                "stderr_tail": p2.stderr[-4000:] if p2.stderr else "",
+            }
+            (combo_out / "diagnostics.json").write_text(json.dumps(fail_diag, indent=2))
+        except Exception:
+            pass
+        return (
+            i,
+            Path(""),
+            {},
+            f"step02_failed: rc={p2.returncode}\n{p2.stdout[-4000:]}\n{p2.stderr[-4000:] if p2.stderr else ''}",
+            log_lines,
+        )
+    # Scoring of opt_csv is batched across the wave by the parent
+    return (i, opt_csv, _aggregate_diagnostics(agg_csv), "ok", log_lines)
+
+
+def _prune_combo_dirs(combo_dirs, max_workers: int = 8) -> None:
+    """Remove combo output directories in parallel.
+
+    The directories come straight from the wave's task list, so there is no
+    need to rescan the wave's ``combos`` directory; missing directories are
+    ignored.
+    """
+    if not combo_dirs:
+        return
+    logging.info(f" Pruning {len(combo_dirs)} non-optimal combination outputs...")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(combo_dirs))) as ex:
+        list(ex.map(lambda p: shutil.rmtree(p, ignore_errors=True), combo_dirs))
+
+
 def run_wave_pipeline(
     wave_config_file,
     output_base_dir,
     max_parallel: int = 1,
     verbose: bool = False,
-    no_emoji: bool = False,
+    quiet_waves: bool = False,
+    prune_nonbest: bool = False,
+    race: bool = False,
+    race_patience: int = 10,
+    mp_ctx=None,
 ):
-    """Run pipeline for a single wave."""
+    """Run pipeline for a single wave.
+
+    Per-combo child output always goes to step log files in the combo
+    directory; with ``quiet_waves`` the Step 03 output is also redirected to
+    ``<wave>/pipeline.log`` instead of the console. With ``prune_nonbest`` the
+    output directories of all non-selected combos are removed once Step 03
+    has succeeded. With ``race`` each finished combo is scored immediately and
+    combos not yet started are skipped once the best selection score has not
+    improved for ``race_patience`` consecutive scored combos. Parallel
+    combo workers are started from ``mp_ctx`` (see ``_combo_mp_context``).
+    """
     logging.info(f" Running pipeline for {wave_config_file}")
 
     # Load wave configuration
@@ -232,25 +797,14 @@ def run_wave_pipeline(
     logging.info(f" Created wave output directory: {wave_output_dir}")
 
     # List all available files in source and save manifest
+    src_dir = Path(wave_config["data_selection"]["source_dir"])
+    uniq = []
     try:
-        src_dir = Path(wave_config["data_selection"]["source_dir"])
-        patterns = [wave_config["data_selection"].get("file_pattern", "*.fz")]
-        files = []
-        for pat in patterns:
-            files.extend(sorted([p for p in src_dir.rglob(pat)]))
-        # Also include .fib.gz if not already covered
-        files.extend(sorted([p for p in src_dir.rglob("*.fib.gz")]))
-        # Deduplicate
-        seen = set()
-        uniq = []
-        for p in files:
-            if p not in seen:
-                uniq.append(p)
-                seen.add(p)
+        pattern = wave_config["data_selection"].get("file_pattern", "*.fz")
+        # Single tree walk; sort by path components like pathlib ordering
+        uniq = sorted(_iter_candidates(src_dir, pattern), key=lambda f: f.split(os.sep))
         available_manifest = wave_output_dir / "available_files.txt"
-        with available_manifest.open("w") as mf:
-            for p in uniq:
-                mf.write(str(p) + "\n")
+        available_manifest.write_text("".join(f"{f}\n" for f in uniq))
         logging.info(f" Available files listed: {available_manifest} ({len(uniq)})")
     except Exception as e:
         logging.warning(f"  Could not list available files: {e}")
@@ -260,33 +814,47 @@ def run_wave_pipeline(
     seed = int(wave_config["data_selection"].get("random_seed") or 42)
     random.seed(seed)
     # Prefer .fz, then .fib.gz
-    fz_files = [p for p in uniq if str(p).endswith(".fz")]
-    fib_files = [p for p in uniq if str(p).endswith(".fib.gz")]
+    fz_files = [f for f in uniq if f.endswith(".fz")]
+    fib_files = [f for f in uniq if f.endswith(".fib.gz")]
     pool = fz_files + fib_files
     if not pool:
         logging.error(" No candidate files found for selection")
         return False
     if n_subjects >= len(pool):
-        selected = pool
+        selected = [Path(f) for f in pool]
     else:
-        selected = random.sample(pool, n_subjects)
+        selected = [Path(f) for f in random.sample(pool, n_subjects)]
     # Write selected manifest and build staging dir with symlinks
     selected_manifest = wave_output_dir / "selected_files.txt"
     with selected_manifest.open("w") as sf:
         for p in selected:
             sf.write(str(p) + "\n")
     logging.info(f" Selected files listed: {selected_manifest} ({len(selected)})")
-    staging_dir = wave_output_dir / "selected_data"
-    staging_dir.mkdir(exist_ok=True)
-    for p in selected:
-        dest = staging_dir / p.name
-        try:
-            if not dest.exists():
-                dest.symlink_to(p)
-        except OSError:
-            # Fallback to copy if symlink not permitted
-            shutil.copy2(p, dest)
-    logging.info(f" Staging data directory: {staging_dir}")
+    subject_list = None
+    if all(p.parent == src_dir for p in selected):
+        # Flat pool: point Step 01 at the source directory and restrict it to
+        # the selected files via the manifest instead of staging symlinks
+        staging_dir = src_dir
+        subject_list = selected_manifest
+        logging.info(f" Using source directory directly: {staging_dir}")
+    else:
+        staging_dir = wave_output_dir / "selected_data"
+        staging_dir.mkdir(exist_ok=True)
+        staged = []
+        for p in selected:
+            dest = os.path.join(staging_dir, p.name)
+            try:
+                os.symlink(p, dest)
+            except FileExistsError:
+                pass
+            except OSError:
+                # Fallback to copy if symlink not permitted
+                shutil.copy2(p, dest)
+            staged.append(dest)
+        # Hand Step 01 the staged paths so it does not rescan the directory
+        subject_list = wave_output_dir / "staged_files.txt"
+        subject_list.write_text("".join(f"{d}\n" for d in dict.fromkeys(staged)))
+        logging.info(f" Staging data directory: {staging_dir}")
 
     # Run the pipeline for this wave
     root = repo_root()
@@ -302,8 +870,9 @@ def run_wave_pipeline(
 
     # Load base extraction config to determine sweep combinations
     try:
-        with open(extraction_cfg, "r") as _f:
-            base_cfg = json.load(_f)
+        base_cfg = _load_extraction_config(
+            extraction_cfg, os.stat(extraction_cfg).st_mtime_ns
+        )
     except Exception as e:
         logging.error(f" Failed to load extraction config {extraction_cfg}: {e}")
         return False
@@ -332,32 +901,6 @@ def run_wave_pipeline(
     combos_dir = wave_output_dir / "combos"
     combos_dir.mkdir(parents=True, exist_ok=True)
 
-    # Helper to echo parameters consistently
-    preferred_order = [
-        "tract_count",
-        "connectivity_threshold",
-        "otsu_threshold",
-        "fa_threshold",
-        "min_length",
-        "max_length",
-        "track_voxel_ratio",
-        "turning_angle",
-        "step_size",
-        "smoothing",
-        "dt_threshold",
-    ]
-
-    def fmt_choice(c: dict) -> str:
-        items = []
-        used = set()
-        for k in preferred_order:
-            if k in c:
-                items.append(f"{k}={c[k]}")
-                used.add(k)
-        for k in sorted([k for k in c.keys() if k not in used]):
-            items.append(f"{k}={c[k]}")
-        return ", ".join(items)
-
     # Execute Step 01+02 for each combination
     optimized_csvs = []
     logging.info(
@@ -367,387 +910,221 @@ def run_wave_pipeline(
     base_threads = int(base_cfg.get("thread_count") or 8)
     adj_threads = max(1, base_threads // max(1, int(max_parallel)))
 
-    # Prepare tasks
+    # Prepare tasks; all derived configs go to one JSONL manifest
+    manifest = sweep_cfg_dir / "sweeps.jsonl"
+    sweep_cfgs = {}
     tasks = []
+    import datetime as _dt
+
+    generated_at = _dt.datetime.now().isoformat(timespec="seconds")
     for i, choice in enumerate(combos, 1):
         # Build derived config with thread_count scaling
         derived = apply_param_choice_to_config(base_cfg, choice, mapping)
-        try:
-            import datetime as _dt
-
-            derived["sweep_meta"] = {
-                "index": i,
-                "choice": choice,
-                "sampler": method,
-                "total_combinations": len(combos),
-                "source_config": extraction_cfg,
-                "generated_at": _dt.datetime.now().isoformat(timespec="seconds"),
-            }
-        except Exception:
-            pass
+        derived["sweep_meta"] = {
+            "index": i,
+            "choice": choice,
+            "sampler": method,
+            "total_combinations": len(combos),
+            "source_config": extraction_cfg,
+            "generated_at": generated_at,
+        }
         derived["thread_count"] = adj_threads
 
-        cfg_path = sweep_cfg_dir / f"sweep_{i:04d}.json"
-        with cfg_path.open("w") as _out:
-            json.dump(derived, _out, indent=2)
+        sweep_cfgs[i] = derived
 
         combo_out = combos_dir / f"sweep_{i:04d}"
         combo_out.mkdir(parents=True, exist_ok=True)
 
-        # Echo parameters
-        logging.info(
-            f" Parameters [{i}/{len(combos)}]: {fmt_choice(choice)} | thread_count={adj_threads}"
-        )
-
-        tasks.append((i, cfg_path, combo_out, False))
-
-    def run_combo(
-        i: int, cfg_path: Path, combo_out: Path, verbose: bool = False
-    ) -> tuple[Path, Path, float, int, str, str]:
-        """Run step01+aggregate+step02 for a single combination.
-        Returns (cfg_path, optimized_csv_path, selection_score, tract_count, status)"""
-        env = os.environ.copy()
-        env.setdefault("PYTHONUNBUFFERED", "1")
-        # Step 01
-        cmd01 = [
-            sys.executable,
-            "-u",
-            str(root / "scripts" / "run_pipeline.py"),
-            "--data-dir",
-            str(staging_dir),
-            "--step",
-            "01",
-            "--output",
-            str(combo_out),
-            "--extraction-config",
-            str(cfg_path),
-        ]
-        p1 = subprocess.run(cmd01, capture_output=True, text=True, env=env)
-        # If verbose, print DSI Studio command from step01 output
-        if verbose and p1.stdout:
-            for line in p1.stdout.splitlines():
-                if "DSI Studio command:" in line:
-                    logging.info(f"[VERBOSE] {line}")
-        if p1.returncode != 0:
-            # Persist failure diagnostics for this combo
-            try:
-                fail_diag = {
-                    "status": "failed",
-                    "stage": "step01",
-                    "wave": wave_name,
-                    "combo_dir": str(combo_out),
-                    "config_path": str(cfg_path),
-                    "return_code": p1.returncode,
-                    "stdout_tail": p1.stdout[-4000:] if p1.stdout else "",
-                    "stderr_tail": p1.stderr[-4000:] if p1.stderr else "",
-                }
-                (combo_out / "diagnostics.json").write_text(
-                    json.dumps(fail_diag, indent=2)
+        # Keep the values reported per combo so the manifest need not be re-read
+        try:
+            tract_count = int(
+                derived.get("sweep_parameters", {}).get(
+                    "tract_count", derived.get("tract_count", -1)
                 )
-            except Exception:
-                pass
-            return (
-                cfg_path,
-                Path(""),
-                -1.0,
-                -1,
-                f"step01_failed: rc={p1.returncode}\n{p1.stdout[-4000:]}\n{p1.stderr[-4000:] if p1.stderr else ''}",
-                "",
             )
+        except (TypeError, ValueError):
+            tract_count = -1
+        meta = {
+            "tract_count": tract_count,
+            "thread_count": adj_threads,
+            "sweep_meta": derived.get("sweep_meta") or {},
+        }
+
+        tasks.append((i, combo_out, meta))
+
+    write_sweep_manifest(manifest, sweep_cfgs.items())
+    # Per-combo parameters are logged on failure and for the selected combo;
+    # the full list goes to the debug log as one record
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(
+            " Sweep combinations: "
+            + json.dumps([{"index": i, "choice": c} for i, c in enumerate(combos, 1)])
+        )
+    logging.info(
+        f" Prepared {len(tasks)} combination(s) | thread_count={adj_threads} | manifest={manifest}"
+    )
 
-        # Aggregate measures
-        agg_csv = combo_out / "01_connectivity" / "aggregated_network_measures.csv"
-        if not agg_csv.exists():
-            cmdAgg = [
-                sys.executable,
-                str(root / "scripts" / "aggregate_network_measures.py"),
-                str(combo_out / "01_connectivity"),
-                str(agg_csv),
-            ]
-            pAgg = subprocess.run(cmdAgg, capture_output=True, text=True)
-            if pAgg.returncode != 0 or not agg_csv.exists():
-                # Persist failure diagnostics for this combo
-                try:
-                    fail_diag = {
-                        "status": "failed",
-                        "stage": "aggregate",
-                        "wave": wave_name,
-                        "combo_dir": str(combo_out),
-                        "config_path": str(cfg_path),
-                        "return_code": pAgg.returncode,
-                        "stdout_tail": pAgg.stdout[-4000:] if pAgg.stdout else "",
-                        "stderr_tail": pAgg.stderr[-4000:] if pAgg.stderr else "",
-                    }
-                    (combo_out / "diagnostics.json").write_text(
-                        json.dumps(fail_diag, indent=2)
-                    )
-                except Exception:
-                    pass
-                return (
-                    cfg_path,
-                    Path(""),
-                    -1.0,
-                    -1,
-                    f"aggregate_failed: rc={pAgg.returncode}\n{pAgg.stdout[-4000:]}\n{pAgg.stderr[-4000:] if pAgg.stderr else ''}",
-                    "",
-                )
-
-        # Step 02
-        step02_dir = combo_out / "02_optimization"
-        step02_dir.mkdir(exist_ok=True)
-        cmd02 = [
-            sys.executable,
-            str(root / "scripts" / "metric_optimizer.py"),
-            "-i",
-            str(agg_csv),
-            "-o",
-            str(step02_dir),
-        ]
-        p2 = subprocess.run(cmd02, capture_output=True, text=True)
-        opt_csv = step02_dir / "optimized_metrics.csv"
-        if p2.returncode != 0 or not opt_csv.exists():
-            # Persist failure diagnostics for this combo
-            try:
-                fail_diag = {
-                    "status": "failed",
-                    "stage": "step02",
-                    "wave": wave_name,
-                    "combo_dir": str(combo_out),
-                    "config_path": str(cfg_path),
-                    "return_code": p2.returncode,
-                    "stdout_tail": p2.stdout[-4000:] if p2.stdout else "",
-                    "stderr_tail": p2.stderr[-4000:] if p2.stderr else "",
-                }
-                (combo_out / "diagnostics.json").write_text(
-                    json.dumps(fail_diag, indent=2)
-                )
-            except Exception:
-                pass
-            return (
-                cfg_path,
-                Path(""),
-                -1.0,
-                -1,
-                f"step02_failed: rc={p2.returncode}\n{p2.stdout[-4000:]}\n{p2.stderr[-4000:] if p2.stderr else ''}",
-                "",
-            )
-        # Evaluate score
-        try:
-            df = pd.read_csv(opt_csv)
-            # Use absolute (raw) mean as primary selector to avoid trivial 1.0 normalization
-            raw_mean = (
-                float(df["quality_score_raw"].mean())
-                if "quality_score_raw" in df.columns
-                else float("nan")
-            )
-            norm_max = (
-                float(df["quality_score"].max())
-                if "quality_score" in df.columns
-                else float("nan")
-            )
-            score = (
-                raw_mean
-                if not np.isnan(raw_mean)
-                else (norm_max if not np.isnan(norm_max) else -1.0)
+    # Child environment is shared by all combos of the wave
+    base_env = {**os.environ, **dict.fromkeys(THREAD_ENV_VARS, str(adj_threads))}
+    base_env.setdefault("PYTHONUNBUFFERED", "1")
+    combo_ctx = {
+        "root": root,
+        "staging_dir": staging_dir,
+        "wave_name": wave_name,
+        "subject_list": subject_list,
+        "env": base_env,
+    }
+    completed = {}
+    scores, score_errors = {}, {}
+    race_state = {"best": None, "stale": 0}
+
+    def _race_should_stop(i, opt_csv) -> bool:
+        """Score a finished combo now; True once the best has held long enough."""
+        s, e = _score_opt_csvs({i: opt_csv})
+        scores.update(s)
+        score_errors.update(e)
+        if i not in s:
+            # A combo that could not be scored says nothing about improvement
+            return False
+        sc = _selection_score(*s[i])
+        if race_state["best"] is None or sc > race_state["best"] + 1e-4:
+            race_state["best"] = sc
+            race_state["stale"] = 0
+            return False
+        race_state["stale"] += 1
+        return race_state["stale"] >= race_patience
+
+    if race:
+        logging.info(
+            f" Racing enabled: stopping after {race_patience} combos without improvement"
+        )
+    if max_parallel <= 1:
+        for n_done, (i, combo_out, meta) in enumerate(tasks, 1):
+            _, opt_csv, aggregates, status, log_lines = run_combo(
+                i, manifest, combo_out, **combo_ctx
             )
-            # Extract tract_count and sweep meta from cfg for tie-breakers and reporting
-            try:
-                with open(cfg_path, "r") as _cf:
-                    _cfg_json = json.load(_cf)
-                tract_count = int(
-                    _cfg_json.get("sweep_parameters", {}).get(
-                        "tract_count", _cfg_json.get("tract_count", -1)
+            for line in log_lines:
+                logging.info(line)
+            if status == "ok":
+                completed[i] = (opt_csv, aggregates)
+                if race and _race_should_stop(i, opt_csv):
+                    logging.info(
+                        f" Race stopped: skipping {len(tasks) - n_done} remaining combination(s)"
                     )
+                    break
+            else:
+                logging.error(
+                    f" [{combo_out.name}] {fmt_choice(combos[i - 1])} | {status}"
                 )
-                thread_count = int(_cfg_json.get("thread_count") or -1)
-                sweep_meta = _cfg_json.get("sweep_meta") or {}
-            except Exception:
-                tract_count = -1
-                thread_count = -1
-                sweep_meta = {}
-            # Diagnostics from aggregated measures
-            dens = float("nan")
-            geff = float("nan")
-            sw_b = float("nan")
-            sw_w = float("nan")
-            try:
-                agg_csv = (
-                    combo_out / "01_connectivity" / "aggregated_network_measures.csv"
-                )
-                diag_df = pd.read_csv(agg_csv)
-                dens = (
-                    float(diag_df["density"].mean())
-                    if "density" in diag_df.columns
-                    else float("nan")
-                )
-                geff = (
-                    float(diag_df["global_efficiency(weighted)"].mean())
-                    if "global_efficiency(weighted)" in diag_df.columns
-                    else float("nan")
-                )
-                sw_b = (
-                    float(diag_df["small-worldness(binary)"].mean())
-                    if "small-worldness(binary)" in diag_df.columns
-                    else float("nan")
-                )
-                sw_w = (
-                    float(diag_df["small-worldness(weighted)"].mean())
-                    if "small-worldness(weighted)" in diag_df.columns
-                    else float("nan")
-                )
-            except Exception:
-                pass
-
-            # Persist per-combo diagnostics JSON
-            try:
-                diag_json = {
-                    "status": "ok",
-                    "wave": wave_name,
-                    "combo_dir": str(combo_out),
-                    "config_path": str(cfg_path),
-                    "combo_index": int(sweep_meta.get("index") or i),
-                    "total_combinations": int(
-                        sweep_meta.get("total_combinations") or -1
-                    ),
-                    "sampler": sweep_meta.get("sampler"),
-                    "parameters": sweep_meta.get("choice"),
-                    "thread_count": thread_count,
-                    "tract_count": tract_count,
-                    "selection_score": float(score),
-                    "quality_score_raw_mean": (
-                        float(raw_mean) if not np.isnan(raw_mean) else None
-                    ),
-                    "quality_score_norm_max": (
-                        float(norm_max) if not np.isnan(norm_max) else None
-                    ),
-                    "aggregates": {
-                        "density_mean": None if np.isnan(dens) else float(dens),
-                        "global_efficiency_weighted_mean": (
-                            None if np.isnan(geff) else float(geff)
-                        ),
-                        "small_worldness_binary_mean": (
-                            None if np.isnan(sw_b) else float(sw_b)
-                        ),
-                        "small_worldness_weighted_mean": (
-                            None if np.isnan(sw_w) else float(sw_w)
-                        ),
-                    },
-                    "files": {
-                        "optimized_metrics_csv": str(opt_csv),
-                        "aggregated_measures_csv": str(agg_csv),
-                    },
-                }
-                (combo_out / "diagnostics.json").write_text(
-                    json.dumps(diag_json, indent=2)
+    else:
+        # Worker processes keep the per-combo aggregation off the parent's GIL
+        # Pin each worker (and the DSI Studio runs it spawns) to its own CPUs
+        slots = _cpu_slots(max_parallel)
+        if mp_ctx is None:
+            mp_ctx = _combo_mp_context()
+        slot_queue = None
+        if slots:
+            slot_queue = mp_ctx.Queue()
+            for cpus in slots:
+                slot_queue.put(cpus)
+            logging.info(
+                f" Pinning {max_parallel} combo workers to {len(slots[0])} CPU(s) each"
+            )
+        with ProcessPoolExecutor(
+            max_workers=max_parallel,
+            mp_context=mp_ctx,
+            initializer=_init_worker,
+            initargs=(slot_queue, adj_threads),
+        ) as ex:
+            futs = {
+                ex.submit(run_combo, i, manifest, combo_out, **combo_ctx): (
+                    i,
+                    combo_out,
                 )
-            except Exception:
-                pass
+                for i, combo_out, meta in tasks
+            }
+            racing = race
+            for fut in as_completed(futs):
+                i, combo_out = futs[fut]
+                if fut.cancelled():
+                    continue
+                try:
+                    _, opt_csv, aggregates, status, log_lines = fut.result()
+                except Exception as e:
+                    logging.error(
+                        f" [{combo_out.name}] {fmt_choice(combos[i - 1])} | exception: {e}"
+                    )
+                    continue
+                for line in log_lines:
+                    logging.info(line)
+                if status == "ok":
+                    completed[i] = (opt_csv, aggregates)
+                    if racing and _race_should_stop(i, opt_csv):
+                        # Combos already running finish; queued ones are dropped
+                        racing = False
+                        n_cancelled = sum(f.cancel() for f in futs)
+                        logging.info(
+                            f" Race stopped: skipping {n_cancelled} queued combination(s)"
+                        )
+                else:
+                    logging.error(
+                        f" [{combo_out.name}] {fmt_choice(combos[i - 1])} | {status}"
+                    )
 
-            # Human-readable diag string for logs
-            extra_bits = []
-            if not np.isnan(dens):
-                extra_bits.append(f"density_mean={dens:.4f}")
-            if not np.isnan(geff):
-                extra_bits.append(f"geff_w_mean={geff:.4f}")
-            diag = " ".join(extra_bits)
-        except Exception as e:
-            # Persist failure cause if scoring failed
+    # Score the remaining successful combos in one batched pass
+    s, e = _score_opt_csvs(
+        {
+            i: opt_csv
+            for i, (opt_csv, _) in completed.items()
+            if i not in scores and i not in score_errors
+        }
+    )
+    scores.update(s)
+    score_errors.update(e)
+    optimized_csvs = []
+    for i, combo_out, meta in tasks:
+        if i not in completed:
+            continue
+        opt_csv, aggregates = completed[i]
+        if i not in scores:
+            err = score_errors.get(i, "no scores")
             try:
                 fail_diag = {
                     "status": "failed",
                     "stage": "score",
                     "wave": wave_name,
                     "combo_dir": str(combo_out),
-                    "config_path": str(cfg_path),
-                    "error": str(e),
+                    "sweep_manifest": str(manifest),
+                    "sweep_index": i,
+                    "error": err,
                 }
                 (combo_out / "diagnostics.json").write_text(
                     json.dumps(fail_diag, indent=2)
                 )
             except Exception:
                 pass
-            return (cfg_path, opt_csv, -1.0, -1, f"score_error: {e}", "")
-        return (cfg_path, opt_csv, score, tract_count, "ok", diag)
-
-    optimized_csvs = []
-    if max_parallel <= 1:
-        for i, cfg_path, combo_out, verbose_flag in tasks:
-            cfg, opt_csv, score, tc, status, diag = run_combo(
-                i, cfg_path, combo_out, verbose_flag
+            logging.error(
+                f" [{combo_out.name}] {fmt_choice(combos[i - 1])} | score_error: {err}"
             )
-            if status == "ok":
-                try:
-                    df = pd.read_csv(opt_csv)
-                    raw_mean = (
-                        float(df["quality_score_raw"].mean())
-                        if "quality_score_raw" in df.columns
-                        else float("nan")
-                    )
-                    norm_max = (
-                        float(df["quality_score"].max())
-                        if "quality_score" in df.columns
-                        else float("nan")
-                    )
-                    extra = f" | {diag}" if diag else ""
-                    if verbose:
-                        logging.info(
-                            f" [{cfg_path.stem}] raw_mean={raw_mean:.3f} | max quality_score(norm)={norm_max:.3f} | tract_count={tc}{extra}"
-                        )
-                except Exception:
-                    if verbose:
-                        logging.info(
-                            f" [{cfg_path.stem}] score={score:.3f} | tract_count={tc}"
-                        )
-                optimized_csvs.append((cfg, opt_csv, score, tc))
-            else:
-                logging.error(f" [{cfg_path.stem}] {status}")
-    else:
-        with ThreadPoolExecutor(max_workers=max_parallel) as ex:
-            futs = {
-                ex.submit(run_combo, i, cfg_path, combo_out, verbose_flag): (
-                    i,
-                    cfg_path,
-                )
-                for i, cfg_path, combo_out, verbose_flag in tasks
-            }
-            for fut in as_completed(futs):
-                i, cfg_path = futs[fut]
-                try:
-                    cfg, opt_csv, score, tc, status, diag = fut.result()
-                except Exception as e:
-                    logging.error(f" [{cfg_path.stem}] exception: {e}")
-                    continue
-                if status == "ok":
-                    try:
-                        df = pd.read_csv(opt_csv)
-                        raw_mean = (
-                            float(df["quality_score_raw"].mean())
-                            if "quality_score_raw" in df.columns
-                            else float("nan")
-                        )
-                        norm_max = (
-                            float(df["quality_score"].max())
-                            if "quality_score" in df.columns
-                            else float("nan")
-                        )
-                        extra = f" | {diag}" if diag else ""
-                        if verbose:
-                            logging.info(
-                                f" [{cfg_path.stem}] raw_mean={raw_mean:.3f} | max quality_score(norm)={norm_max:.3f} | tract_count={tc}{extra}"
-                            )
-                    except Exception:
-                        if verbose:
-                            logging.info(
-                                f" [{cfg_path.stem}] score={score:.3f} | tract_count={tc}"
-                            )
-                    optimized_csvs.append((cfg, opt_csv, score, tc))
-                else:
-                    logging.error(f" [{cfg_path.stem}] {status}")
+            continue
+        raw_mean, norm_max = scores[i]
+        score, diag = _finish_combo(
+            i,
+            combo_out,
+            opt_csv,
+            aggregates,
+            raw_mean,
+            norm_max,
+            meta=meta,
+            manifest=manifest,
+            wave_name=wave_name,
+        )
+        if verbose:
+            logging.info(f" [{combo_out.name}] {fmt_choice(combos[i - 1])} | {diag}")
+        optimized_csvs.append((i, opt_csv, score, int(meta.get("tract_count", -1))))
 
     # After running all combos, aggregate diagnostics.json files to a wave-level CSV
     try:
-        import csv as _csv
-
         diag_rows = []
         for child in combos_dir.iterdir():
             if child.is_dir() and child.name.startswith("sweep_"):
@@ -803,7 +1180,7 @@ def run_wave_pipeline(
                 "small_worldness_weighted_mean",
             ]
             with out_csv.open("w", newline="") as f:
-                w = _csv.DictWriter(f, fieldnames=cols)
+                w = csv.DictWriter(f, fieldnames=cols)
                 w.writeheader()
                 for r in sorted(diag_rows, key=lambda r: (r.get("combo_index") or 0)):
                     w.writerow({k: r.get(k) for k in cols})
@@ -827,43 +1204,42 @@ def run_wave_pipeline(
     best_score = -1.0
     best_tc = None
     eps = 1e-4
-    for cfg_path, opt_csv, sc, tc in optimized_csvs:
+    for i, opt_csv, sc, tc in optimized_csvs:
         if verbose:
-            logging.info(
-                f" {cfg_path.stem}: selection_score={sc:.3f} | tract_count={tc}"
-            )
+            logging.info(f" sweep_{i:04d}: selection_score={sc:.3f} | tract_count={tc}")
         if (sc > best_score + eps) or (
             abs(sc - best_score) <= eps
             and (best_tc is None or (tc != -1 and tc < best_tc))
         ):
             best_score = sc
             best_tc = tc
-            best = (cfg_path, opt_csv)
+            best = (i, opt_csv)
 
     if not best:
         logging.error(" Could not determine best combination (no scores)")
         return False
 
     # Step 03: run optimal selection for the best combo into wave root
-    best_cfg, best_opt_csv = best
+    best_i, best_opt_csv = best
     logging.info(
-        f" Selected best parameters: {best_cfg.name} (selection_score={best_score:.3f}, tract_count={best_tc})"
+        f" Selected best parameters: sweep_{best_i:04d} (selection_score={best_score:.3f}, tract_count={best_tc})"
     )
+    logging.info(f"   {fmt_choice(combos[best_i - 1])}")
     step03_dir = wave_output_dir / "03_selection"
     step03_dir.mkdir(exist_ok=True)
-    cmd03 = [
-        sys.executable,
-        str(root / "scripts" / "optimal_selection.py"),
-        "-i",
-        str(best_opt_csv),
-        "-o",
-        str(step03_dir),
-    ]
-    # Propagate --no-emoji flag to subprocess
-    if no_emoji:
-        cmd03.append("--no-emoji")
-    logging.debug(f" Step03 cmd: {' '.join(cmd03)}")
-    rc3 = subprocess.call(cmd03)
+    # Step 03 runs in this interpreter, which already has pandas loaded
+    from scripts import optimal_selection
+
+    if quiet_waves:
+        rc3 = _run_inprocess(
+            optimal_selection.run,
+            wave_output_dir / "pipeline.log",
+            optimal_selection.__name__,
+            str(best_opt_csv),
+            str(step03_dir),
+        ).returncode
+    else:
+        rc3 = optimal_selection.run(str(best_opt_csv), str(step03_dir))
     if rc3 != 0:
         logging.error(" Step 03 failed for best combination")
         return False
@@ -871,13 +1247,15 @@ def run_wave_pipeline(
     # Persist selection metadata
     try:
         meta_out = wave_output_dir / "selected_parameters.json"
-        with open(best_cfg, "r") as _in, meta_out.open("w") as _out:
-            data = json.load(_in)
-            json.dump({"selected_config": data}, _out, indent=2)
+        with meta_out.open("w") as _out:
+            json.dump({"selected_config": sweep_cfgs[best_i]}, _out, indent=2)
         logging.info(f" Selected parameters saved to {meta_out}")
     except Exception:
         pass
 
+    if prune_nonbest:
+        _prune_combo_dirs([co for i, co, _ in tasks if i != best_i])
+
     logging.info(f" Wave {wave_name} completed successfully")
     return True
 
@@ -928,6 +1306,27 @@ def main():
         action="store_true",
         help="Show DSI Studio command for each run in main sweep log",
     )
+    parser.add_argument(
+        "--quiet-waves",
+        action="store_true",
+        help="Write Step 03 output to <wave>/pipeline.log instead of the console",
+    )
+    parser.add_argument(
+        "--prune-nonbest",
+        action="store_true",
+        help="Delete outputs of non-optimal combinations after each wave",
+    )
+    parser.add_argument(
+        "--race",
+        action="store_true",
+        help="Stop a wave early once the best combination stops improving (non-deterministic with --max-parallel > 1)",
+    )
+    parser.add_argument(
+        "--race-patience",
+        type=int,
+        default=10,
+        help="With --race: scored combinations without improvement before stopping (default: 10)",
+    )
 
     args = parser.parse_args()
 
@@ -996,6 +1395,10 @@ def main():
         logging.info(f" Wave 1 config: {wave1_config}")
         logging.info(f" Wave 2 config: {wave2_config}")
 
+    # One worker context for both waves; the forkserver preload is only
+    # honoured before its server starts
+    mp_ctx = _combo_mp_context() if args.max_parallel > 1 else None
+
     # Record start time
     start_time = time.time()
 
@@ -1009,7 +1412,11 @@ def main():
         output_dir,
         max_parallel=args.max_parallel,
         verbose=args.verbose,
-        no_emoji=args.no_emoji,
+        quiet_waves=args.quiet_waves,
+        prune_nonbest=args.prune_nonbest,
+        race=args.race,
+        race_patience=args.race_patience,
+        mp_ctx=mp_ctx,
     )
     wave1_duration = time.time() - wave1_start
     logging.info(f"  Wave completed in {wave1_duration:.1f} seconds")
@@ -1027,7 +1434,11 @@ def main():
             output_dir,
             max_parallel=args.max_parallel,
             verbose=args.verbose,
-            no_emoji=args.no_emoji,
+            quiet_waves=args.quiet_waves,
+            prune_nonbest=args.prune_nonbest,
+            race=args.race,
+            race_patience=args.race_patience,
+            mp_ctx=mp_ctx,
         )
         wave2_duration = time.time() - wave2_start
         logging.info(f"  Wave 2 completed in {wave2_duration:.1f} seconds")
@@ -20,13 +20,14 @@ import json
 import pandas as pd
 import random
 import glob
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from scripts.utils.runtime import (
     configure_stdio,
     prepare_path_for_subprocess,
     propagate_no_emoji,
 )
+from scripts.sweep_utils import load_sweep_config
 
 configure_stdio()
 
@@ -1766,6 +1767,25 @@ def create_batch_processor(
     return batch_results
 
 
+def read_subject_list(list_file: str, input_dir: Optional[str] = None) -> List[str]:
+    """Read a subject manifest (one fiber file per line).
+
+    Relative entries that do not exist from the working directory are
+    resolved against ``input_dir``; blank lines and missing files are skipped.
+    """
+    files = []
+    with open(list_file, "r") as f:
+        for line in f:
+            entry = line.strip()
+            if not entry:
+                continue
+            if not os.path.isfile(entry) and input_dir and not os.path.isabs(entry):
+                entry = os.path.join(input_dir, entry)
+            if os.path.isfile(entry):
+                files.append(os.path.abspath(entry))
+    return files
+
+
 def main():
     """Main function for command-line interface."""
     parser = argparse.ArgumentParser(
@@ -1833,6 +1853,16 @@ For more help: see README.md
         type=str,
         help=" JSON configuration file (recommended - see example_config.json)",
     )
+    parser.add_argument(
+        "--sweep-manifest",
+        type=str,
+        help=" JSONL sweep manifest from the optimizer (use with --sweep-index instead of --config)",
+    )
+    parser.add_argument(
+        "--sweep-index",
+        type=int,
+        help=" 1-based combination index to read from --sweep-manifest",
+    )
 
     # Processing mode
     parser.add_argument(
@@ -1860,6 +1890,11 @@ For more help: see README.md
         help=" File pattern for batch mode (default: *.fib.gz, also searches .fz)",
     )
 
+    parser.add_argument(
+        "--subject-list",
+        help=" Batch mode: text file listing fiber files to process (one per line); skips directory scan",
+    )
+
     # Override configuration settings
     parser.add_argument(
         "-a",
@@ -1979,6 +2014,8 @@ For more help: see README.md
     )
 
     args = parser.parse_args()
+    if args.sweep_manifest and args.sweep_index is None:
+        parser.error("--sweep-manifest requires --sweep-index")
 
     configure_stdio(args.no_emoji)
 
@@ -1997,7 +2034,12 @@ For more help: see README.md
         args.output = args.output_opt
 
     # Show help if no arguments provided
-    if len(sys.argv) == 1 or (not args.input and not args.output and not args.config):
+    if len(sys.argv) == 1 or (
+        not args.input
+        and not args.output
+        and not args.config
+        and not args.sweep_manifest
+    ):
         parser.print_help()
         print("\n TIP: Start with validation:")
         print("   python scripts/validate_setup.py --config example_config.json")
@@ -2016,6 +2058,15 @@ For more help: see README.md
         except json.JSONDecodeError as e:
             print(f" Invalid JSON in configuration file: {e}")
             sys.exit(1)
+    elif args.sweep_manifest:
+        try:
+            config.update(load_sweep_config(args.sweep_manifest, args.sweep_index))
+        except FileNotFoundError:
+            print(f" Sweep manifest not found: {args.sweep_manifest}")
+            sys.exit(1)
+        except (KeyError, json.JSONDecodeError) as e:
+            print(f" Could not read sweep {args.sweep_index} from manifest: {e}")
+            sys.exit(1)
 
     # Override with command line arguments (only if provided)
     if args.atlases:
@@ -2104,15 +2155,26 @@ For more help: see README.md
             print(f" Input directory: {args.input}")
             print(f" File pattern: {args.pattern}")
 
-            # Validate input path and find files
-            input_validation = extractor.validate_input_path(args.input, args.pattern)
-            if not input_validation["valid"]:
-                print(" Input validation failed!")
-                for error in input_validation["errors"]:
-                    print(f"    {error}")
-                sys.exit(1)
+            if args.subject_list:
+                # Explicit manifest: process exactly the listed files
+                print(f" Subject list: {args.subject_list}")
+                try:
+                    fiber_files = read_subject_list(args.subject_list, args.input)
+                except OSError as e:
+                    print(f" Could not read subject list: {e}")
+                    sys.exit(1)
+            else:
+                # Validate input path and find files
+                input_validation = extractor.validate_input_path(
+                    args.input, args.pattern
+                )
+                if not input_validation["valid"]:
+                    print(" Input validation failed!")
+                    for error in input_validation["errors"]:
+                        print(f"    {error}")
+                    sys.exit(1)
 
-            fiber_files = input_validation["files_found"]
+                fiber_files = input_validation["files_found"]
             if not fiber_files:
                 print(" No fiber files found!")
                 print(" Supported formats: .fib.gz and .fz files")
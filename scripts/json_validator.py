@@ -9,6 +9,7 @@ are present and values are valid.
 Author: Braingraph Pipeline Team
 """
 
+import functools
 import json
 import os
 from pathlib import Path
@@ -20,6 +21,30 @@ except ImportError:
     jsonschema = None
 
 
+@functools.lru_cache(maxsize=32)
+def _parse_json_file(path: str, mtime_ns: int) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_json_config(config_path: str) -> Any:
+    """
+    Parse a JSON configuration file, reusing the last parse of an unchanged file.
+
+    The cache is keyed by path and modification time, so validating, checking
+    required fields and suggesting fixes for one file parse it only once.
+    The returned object is shared between callers and must not be modified.
+
+    Args:
+        config_path: Path to configuration file
+
+    Returns:
+        Parsed JSON content
+    """
+    config_path = os.fspath(config_path)
+    return _parse_json_file(config_path, os.stat(config_path).st_mtime_ns)
+
+
 class JSONValidator:
     """
     Comprehensive JSON validation class for DSI Studio configurations.
@@ -70,8 +95,7 @@ class JSONValidator:
             True if file contains valid JSON
         """
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                json.load(f)
+            load_json_config(filepath)
             return True
         except (json.JSONDecodeError, FileNotFoundError, OSError):
             return False
@@ -100,8 +124,7 @@ class JSONValidator:
 
         # Load configuration
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            config = load_json_config(config_path)
         except Exception as e:
             self.errors.append(f"Failed to load configuration: {e}")
             return False, self.errors
@@ -370,8 +393,7 @@ class JSONValidator:
             return []
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            config = load_json_config(config_path)
         except Exception:
             return []
 
@@ -402,8 +424,7 @@ class JSONValidator:
             return suggestions
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            config = load_json_config(config_path)
         except json.JSONDecodeError:
             suggestions.append("Fix JSON syntax errors in configuration file")
             return suggestions
@@ -1080,18 +1080,37 @@ def main():
     logger_root.addHandler(fh)
     logger_root.addHandler(ch)
 
+    return run(
+        args.input_file, args.output_dir, config_path=args.config, plots=args.plots
+    )
+
+
+def run(
+    input_file: str,
+    output_dir: str,
+    config_path: Optional[str] = None,
+    plots: bool = False,
+) -> int:
+    """Run Step 02 on an aggregated CSV and write results to ``output_dir``.
+
+    Importable entry point used by ``main()`` and by callers that want to
+    avoid spawning a new interpreter. Returns a process-style exit code.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
     # Load configuration
     config = None
-    if args.config and Path(args.config).exists():
+    if config_path and Path(config_path).exists():
         import json
 
-        with open(args.config, "r") as f:
+        with open(config_path, "r") as f:
             config = json.load(f).get("optimization", {})
 
     # Load data
     try:
-        df = pd.read_csv(args.input_file)
-        logger.info(f"Loaded {len(df)} records from {args.input_file}")
+        df = pd.read_csv(input_file)
+        logger.info(f"Loaded {len(df)} records from {input_file}")
 
         # Validate required columns
         required_cols = ["atlas", "connectivity_metric"]
@@ -1108,7 +1127,7 @@ def main():
         )
 
     except Exception as e:
-        logger.error(f"Error loading data from {args.input_file}: {e}")
+        logger.error(f"Error loading data from {input_file}: {e}")
         return 1
 
     # Initialize optimizer and run optimization
@@ -1127,7 +1146,7 @@ def main():
         optimizer.generate_report(optimized_df, str(report_file))
 
         # Generate plots if requested
-        if args.plots:
+        if plots:
             plot_files = optimizer.create_optimization_plots(
                 optimized_df, str(output_path)
             )
@@ -11,13 +11,21 @@ and resolving paths relative to the repository root automatically.
 from __future__ import annotations
 
 import argparse
+import functools
 import os
 import sys
 from pathlib import Path
 
-from scripts.utils.runtime import configure_stdio, propagate_no_emoji
+from scripts.utils.runtime import (
+    configure_stdio,
+    propagate_no_emoji,
+    terminate_process,
+)
 
+VERSION = "OptiConn v2.0.0"
 
+
+@functools.lru_cache(maxsize=None)
 def repo_root() -> Path:
     """Return repository root directory (parent of scripts/)."""
     # This file lives at <repo>/scripts/opticonn_hub.py
@@ -25,47 +33,95 @@ def repo_root() -> Path:
 
 
 def _abs(path_like: str | os.PathLike | None) -> str | None:
+    # Children only need absolute paths, not symlink-free ones: abspath is
+    # pure string normalization (plus one getcwd for relative input)
     if not path_like:
         return None
-    return str(Path(path_like).resolve())
+    return os.path.abspath(os.fspath(path_like))
+
+
+def _find_selection_files(optimize_dir: Path) -> list[Path]:
+    """Return every ``03_selection/optimal_combinations.json`` under optimize_dir.
+
+    Sweeps lay waves out as ``<optimize_dir>/<wave>/03_selection``, so that
+    depth is probed first with a single ``os.scandir``. Only when no wave
+    matches does it fall back to an iterative search of the whole tree that,
+    like ``glob``, skips hidden directories, and also prunes the per-combo
+    ``combos`` trees (combos never run Step 03). ``03_selection`` directories
+    are probed for the file directly instead of being listed.
+    """
+    found = []
+    try:
+        with os.scandir(optimize_dir) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                candidate = os.path.join(
+                    entry.path, "03_selection", "optimal_combinations.json"
+                )
+                if os.path.isfile(candidate):
+                    found.append(Path(candidate))
+    except OSError:
+        pass
+    if found:
+        return sorted(found)
+
+    pending = [os.fspath(optimize_dir)]
+    while pending:
+        try:
+            it = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(".") or name == "combos":
+                    continue
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if name == "03_selection":
+                    candidate = os.path.join(entry.path, "optimal_combinations.json")
+                    if os.path.isfile(candidate):
+                        found.append(Path(candidate))
+                else:
+                    pending.append(entry.path)
+    return sorted(found)
+
+
+def _candidate_score(obj: dict) -> float:
+    """Ranking score of one optimal_combinations.json entry for ``apply``."""
+    for k in ("average_score", "score", "pure_qa_score", "quality_score"):
+        v = obj.get(k)
+        if isinstance(v, (int, float)):
+            return float(v)
+    pw = obj.get("per_wave")
+    if isinstance(pw, list):
+        vals = [
+            w.get("score")
+            for w in pw
+            if isinstance(w, dict) and isinstance(w.get("score"), (int, float))
+        ]
+        if vals:
+            return float(sum(vals) / len(vals))
+    return 0.0
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="OptiConn - Unbiased, modality-agnostic connectomics optimization & analysis",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-3-Step Workflow:
-  1. opticonn sweep -i /path/to/data -o studies/run1 --quick
-     → Compute connectivity & metrics for parameter combinations across waves
+def _run_child(cmd: list[str], env: dict[str, str] | None = None) -> None:
+    """``subprocess.run(check=True)`` that can use CPython's posix_spawn path.
 
-  2. opticonn review -o studies/run1/sweep-<uuid>/optimize
-     → Auto-select best candidate based on QA+consistency (or use --interactive for GUI)
+    Descriptors opened by Python are non-inheritable (PEP 446), so
+    ``close_fds=False`` leaks nothing to the child; it is what lets
+    ``subprocess`` spawn via ``posix_spawn`` instead of fork/exec.
+    """
+    import subprocess
 
-  3. opticonn apply --data-dir /path/to/full/dataset --optimal-config studies/run1/sweep-<uuid>/optimize/selected_candidate.json --output-dir studies/run1
-     → Apply selected parameters to full dataset
+    subprocess.run(cmd, check=True, env=env, close_fds=False)
 
-Advanced:
-  opticonn pipeline --step all --data-dir /path/to/fz --output studies/run2 --config my_config.json
-  opticonn review -o studies/run1/sweep-<uuid>/optimize --interactive  # Launch web GUI for manual selection
-        """,
-    )
 
-    parser.add_argument("--version", action="version", version="OptiConn v2.0.0")
-    parser.add_argument(
-        "--no-emoji",
-        action="store_true",
-        help="Disable emoji in console output (useful on limited terminals)",
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        default=False,
-        help="Perform a dry-run: print the command(s) that would be executed without running them",
-    )
-    subparsers = parser.add_subparsers(dest="command", required=True)
-
-    # review
+def _add_review_parser(subparsers) -> None:
+    """Register the ``review`` subcommand."""
     p_review = subparsers.add_parser(
         "review",
         help="Review sweep or Bayesian optimization results and select best candidate",
@@ -87,7 +143,9 @@ Advanced:
         help="Disable emoji in console output (Windows-safe)",
     )
 
-    # sweep
+
+def _add_sweep_parser(subparsers) -> None:
+    """Register the ``sweep`` subcommand."""
     p_sweep = subparsers.add_parser(
         "sweep", help="Run parameter sweep using cross-validation"
     )
@@ -149,8 +207,15 @@ Advanced:
         action="store_true",
         help="Show DSI Studio commands and detailed progress for each combination",
     )
+    p_sweep.add_argument(
+        "--prune-nonbest",
+        action="store_true",
+        help="Delete outputs of non-optimal combinations after each wave to save disk space",
+    )
+
 
-    # apply
+def _add_apply_parser(subparsers) -> None:
+    """Register the ``apply`` subcommand."""
     p_apply = subparsers.add_parser(
         "apply",
         help="Apply optimal parameters to full dataset",
@@ -207,7 +272,9 @@ Advanced:
         help="[DEPRECATED] Use --analysis-only instead",
     )
 
-    # bayesian (NEW)
+
+def _add_bayesian_parser(subparsers) -> None:
+    """Register the ``bayesian`` subcommand."""
     p_bayesian = subparsers.add_parser(
         "bayesian",
         help=" Bayesian optimization for parameter search (efficient, smart)",
@@ -259,7 +326,9 @@ Advanced:
         "--no-emoji", action="store_true", help="Disable emoji in console output"
     )
 
-    # sensitivity (NEW)
+
+def _add_sensitivity_parser(subparsers) -> None:
+    """Register the ``sensitivity`` subcommand."""
     p_sensitivity = subparsers.add_parser(
         "sensitivity",
         help=" Analyze parameter sensitivity (which params matter most)",
@@ -297,7 +366,9 @@ Advanced:
         "--no-emoji", action="store_true", help="Disable emoji in console output"
     )
 
-    # pipeline
+
+def _add_pipeline_parser(subparsers) -> None:
+    """Register the ``pipeline`` subcommand."""
     p_pipe = subparsers.add_parser(
         "pipeline", help="Advanced pipeline execution (steps 01–03)"
     )
@@ -316,6 +387,110 @@ Advanced:
         help="Disable emoji in console output (Windows-safe)",
     )
 
+
+def _add_batch_parser(subparsers) -> None:
+    """Register the ``batch`` subcommand."""
+    p_batch = subparsers.add_parser(
+        "batch",
+        help="Run independent opticonn commands from a JSON job list concurrently",
+        description="Each job is an argument list for opticonn (e.g. "
+        '["review", "-i", "studies/run1/sweep-x/optimize"]) or an object '
+        '{"args": [...], "priority": N}; higher priorities are started first.',
+    )
+    p_batch.add_argument("--jobs", required=True, help="JSON job list file")
+    p_batch.add_argument(
+        "--max-workers",
+        type=int,
+        default=2,
+        help="Number of jobs to run at the same time (default: 2)",
+    )
+    p_batch.add_argument(
+        "--no-emoji", action="store_true", help="Disable emoji in console output"
+    )
+
+
+# Subcommand name -> parser builder, in help listing order
+_SUBCOMMAND_BUILDERS = {
+    "review": _add_review_parser,
+    "sweep": _add_sweep_parser,
+    "apply": _add_apply_parser,
+    "bayesian": _add_bayesian_parser,
+    "sensitivity": _add_sensitivity_parser,
+    "pipeline": _add_pipeline_parser,
+    "batch": _add_batch_parser,
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """Guess which subcommand ``argv`` runs, so only its parser is built.
+
+    Returns the subcommand name, ``""`` for a bare ``--version`` (no
+    subcommand parsers needed), or ``None`` when all of them must be built
+    (top-level help, a missing or unknown command).
+    """
+    for tok in argv:
+        if tok in ("-h", "--help"):
+            return None
+        if tok == "--version":
+            return ""
+        if not tok.startswith("-"):
+            return tok if tok in _SUBCOMMAND_BUILDERS else None
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """Build the ``opticonn`` argument parser (cached; only parse_args() on it).
+
+    With ``command`` set, only that subcommand's parser is registered.
+    """
+    parser = argparse.ArgumentParser(
+        description="OptiConn - Unbiased, modality-agnostic connectomics optimization & analysis",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+3-Step Workflow:
+  1. opticonn sweep -i /path/to/data -o studies/run1 --quick
+     → Compute connectivity & metrics for parameter combinations across waves
+
+  2. opticonn review -o studies/run1/sweep-<uuid>/optimize
+     → Auto-select best candidate based on QA+consistency (or use --interactive for GUI)
+
+  3. opticonn apply --data-dir /path/to/full/dataset --optimal-config studies/run1/sweep-<uuid>/optimize/selected_candidate.json --output-dir studies/run1
+     → Apply selected parameters to full dataset
+
+Advanced:
+  opticonn pipeline --step all --data-dir /path/to/fz --output studies/run2 --config my_config.json
+  opticonn review -o studies/run1/sweep-<uuid>/optimize --interactive  # Launch web GUI for manual selection
+  opticonn batch --jobs jobs.json --max-workers 2  # Run independent commands concurrently
+        """,
+    )
+
+    parser.add_argument("--version", action="version", version=VERSION)
+    parser.add_argument(
+        "--no-emoji",
+        action="store_true",
+        help="Disable emoji in console output (useful on limited terminals)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=False,
+        help="Perform a dry-run: print the command(s) that would be executed without running them",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, add_parser in _SUBCOMMAND_BUILDERS.items():
+        if command is None or name == command:
+            add_parser(subparsers)
+    return parser
+
+
+def main() -> int:
+    # Answer a bare version query before any parser is built
+    if sys.argv[1:] == ["--version"]:
+        print(VERSION)
+        return 0
+
+    parser = _build_parser(_sniff_subcommand(sys.argv[1:]))
     args = parser.parse_args()
 
     # Print help when called without args
@@ -323,22 +498,33 @@ Advanced:
         parser.print_help()
         return 0
 
-    root = repo_root()
-    scripts_dir = root / "scripts"
+    # Child script paths are only ever handed to argv, so keep them as
+    # plain strings instead of building a Path per command
+    root = os.fspath(repo_root())
+    scripts_dir = os.path.join(root, "scripts")
+    default_config_path = os.path.join(
+        root, "configs", "braingraph_default_config.json"
+    )
     no_emoji = configure_stdio(getattr(args, "no_emoji", False))
 
-    import uuid
-    import subprocess
+    def check_json_config(config_path):
+        # The validator is plain Python; run it in-process rather than paying
+        # for a second interpreter start on every sweep/apply/pipeline call
+        from scripts.json_validator import validate_config_file
+
+        schema_path = os.path.join(scripts_dir, "dsi_studio_config_schema.json")
+        try:
+            is_valid = validate_config_file(
+                config_path, schema_path if os.path.exists(schema_path) else None
+            )
+        except Exception as e:
+            print(f" Configuration validation failed for {config_path}: {e}")
+            is_valid = False
+        print()
+        return is_valid
 
     def validate_json_config(config_path):
-        validator_script = str(scripts_dir / "json_validator.py")
-        result = subprocess.run(
-            [sys.executable, validator_script, config_path, "--suggest-fixes"],
-            capture_output=True,
-            text=True,
-        )
-        print(result.stdout)
-        if result.returncode != 0:
+        if not check_json_config(config_path):
             print("Config validation failed. Exiting.")
             sys.exit(1)
 
@@ -393,73 +579,124 @@ Advanced:
             # Handle sweep results directory (existing logic)
             # Auto-select best candidate based on QA + wave consistency (DEFAULT)
             import json
-            import glob
 
             optimize_dir = input_path
-            pattern = str(optimize_dir / "**/03_selection/optimal_combinations.json")
-            files = glob.glob(pattern, recursive=True)
+            files = _find_selection_files(optimize_dir)
 
             if not files:
                 print(" No optimal_combinations.json files found in optimize directory")
                 return 1
 
-            # Load all candidates from all waves, with their parameters
-            all_candidates = []
-            wave_params_map = {}  # Map wave_name -> parameters
+            from concurrent.futures import ThreadPoolExecutor
 
-            for file_path in files:
+            def _load_wave(file_path):
+                candidates = json.loads(file_path.read_bytes())
+                if not isinstance(candidates, list):
+                    raise ValueError("expected a list of candidates")
+                wave_dir = file_path.parent.parent
+                config = None
+                # Load tracking parameters for this wave
                 try:
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
-                        if isinstance(data, list):
-                            wave_dir = Path(file_path).parent.parent
-                            wave_name = wave_dir.name
-
-                            # Load tracking parameters for this wave
-                            params_file = wave_dir / "selected_parameters.json"
-                            if params_file.exists():
-                                with open(params_file, "r") as pf:
-                                    params_data = json.load(pf)
-                                    config = params_data.get(
-                                        "selected_config", params_data
-                                    )
-                                    wave_params_map[wave_name] = config
-
-                            for item in data:
-                                item["wave"] = wave_name
-                            all_candidates.extend(data)
-                except Exception as e:
-                    print(f"  Warning: Could not load {file_path}: {e}")
+                    params_data = json.loads(
+                        (wave_dir / "selected_parameters.json").read_bytes()
+                    )
+                except FileNotFoundError:
+                    pass
+                else:
+                    config = params_data.get("selected_config", params_data)
+                return wave_dir.name, candidates, config
 
-            if not all_candidates:
+            def _try_load_wave(file_path):
+                try:
+                    return _load_wave(file_path), None
+                except Exception as e:
+                    return None, e
+
+            # Missing or NaN scores never win, as with pandas' idxmax()
+            def _qa(value):
+                if isinstance(value, (int, float)) and value == value:
+                    return float(value)
+                return float("-inf")
+
+            def _key(row):
+                return (row.get("atlas"), row.get("connectivity_metric"))
+
+            # Fold every wave's candidates into per-key aggregates as they
+            # load; files are read concurrently (I/O bound on network mounts)
+            # but consumed in sorted order so selection stays deterministic.
+            # Only the first row per (atlas, metric) and the best-scoring row
+            # overall are kept, so memory follows the number of distinct keys.
+            wave_params_map = {}  # Map wave_name -> parameters
+            waves_by_key = {}
+            qa_sum_by_key = {}
+            qa_count_by_key = {}
+            repr_row_by_key = {}
+            best_row_by_qa = None
+            best_qa = float("-inf")
+            waves_seen = set()
+
+            with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+                for file_path, (result, error) in zip(
+                    files, pool.map(_try_load_wave, files)
+                ):
+                    if error is not None:
+                        print(f"  Warning: Could not load {file_path}: {error}")
+                        continue
+                    wave_name, candidates, config = result
+                    if config is not None:
+                        wave_params_map[wave_name] = config
+                    for candidate in candidates:
+                        waves_seen.add(wave_name)
+                        key = _key(candidate)
+                        if key not in repr_row_by_key:
+                            repr_row_by_key[key] = {**candidate, "wave": wave_name}
+                            waves_by_key[key] = set()
+                        waves_by_key[key].add(wave_name)
+                        qa = _qa(candidate.get("pure_qa_score"))
+                        if qa != float("-inf"):
+                            qa_sum_by_key[key] = qa_sum_by_key.get(key, 0) + qa
+                            qa_count_by_key[key] = qa_count_by_key.get(key, 0) + 1
+                        # Strictly greater keeps the first of equal scores
+                        if best_row_by_qa is None or qa > best_qa:
+                            best_row_by_qa = {**candidate, "wave": wave_name}
+                            best_qa = qa
+
+            if not repr_row_by_key:
                 print(" No candidates found in optimal_combinations files")
                 return 1
 
-            # Find best candidate: highest QA score among those present in all waves
-            import pandas as pd
-
-            df = pd.DataFrame(all_candidates)
-            df["candidate_key"] = df["atlas"] + "_" + df["connectivity_metric"]
-            wave_counts = df.groupby("candidate_key")["wave"].nunique().to_dict()
-            df["waves_present"] = df["candidate_key"].map(wave_counts)
-
-            total_waves = df["wave"].nunique()
-            consistent = df[df["waves_present"] == total_waves].copy()
+            # Find best candidate: highest average QA score among those
+            # present in all waves
+            avg_by_key = {
+                k: qa_sum_by_key[k] / qa_count_by_key[k] for k in qa_sum_by_key
+            }
+            total_waves = len(waves_seen)
+            consistent = [
+                k for k, waves in waves_by_key.items() if len(waves) == total_waves
+            ]
 
-            if consistent.empty:
+            avg_qa = None
+            if not consistent:
                 print(
                     f"  No candidates appear in all {total_waves} waves. Selecting best overall QA score..."
                 )
-                best_idx = df["pure_qa_score"].idxmax()
-                best = df.loc[best_idx]
+                best = best_row_by_qa
             else:
-                # Among consistent candidates, pick highest avg QA
-                avg_qa = df.groupby("candidate_key")["pure_qa_score"].mean().to_dict()
-                consistent["avg_qa"] = consistent["candidate_key"].map(avg_qa)
-                best_idx = consistent["avg_qa"].idxmax()
-                best = consistent.loc[best_idx]
+                # Keys are in first-seen order and max() keeps the first of
+                # equal averages, so ties resolve as they did row by row
+                best_key = max(
+                    consistent, key=lambda k: avg_by_key.get(k, float("-inf"))
+                )
+                best = repr_row_by_key[best_key]
+                avg_qa = avg_by_key.get(best_key)
 
-            best_dict = best.to_dict()
+            best_dict = dict(best)
+            best_dict["candidate_key"] = (
+                f"{best_dict['atlas']}_{best_dict['connectivity_metric']}"
+            )
+            best_dict["waves_present"] = len(waves_by_key[_key(best)])
+            if avg_qa is not None:
+                best_dict["avg_qa"] = avg_qa
 
             # Attach tracking parameters from the winning wave
             best_wave = best_dict.get("wave")
@@ -483,11 +720,15 @@ Advanced:
                 )
 
             # Save selection
+            # Written via a temp file and renamed so an interrupted review
+            # never leaves a truncated selection behind for apply
             out_path = optimize_dir / "selected_candidate.json"
-            with open(out_path, "w") as f:
+            tmp_path = out_path.with_name(out_path.name + ".tmp")
+            with open(tmp_path, "w") as f:
                 json.dump(
                     [best_dict], f, indent=2
                 )  # Wrap in list for apply compatibility
+            os.replace(tmp_path, out_path)
 
             print(" Auto-selected best candidate:")
             print(f"   Atlas: {best_dict['atlas']}")
@@ -505,41 +746,45 @@ Advanced:
                 import shutil
 
                 print("\n Pruning non-optimal combination outputs...")
-                best_combo_key = (
-                    f"{best_dict['atlas']}_{best_dict['connectivity_metric']}"
-                )
 
-                # Find all wave directories
-                wave_dirs = [
-                    d
-                    for d in optimize_dir.iterdir()
-                    if d.is_dir() and d.name.startswith("wave")
-                ]
-                pruned_count = 0
-
-                for wave_dir in wave_dirs:
-                    combos_dir = wave_dir / "01_combos"
-                    if not combos_dir.exists():
+                # Each wave keeps the combo its own Step 03 selected (the
+                # sweep index recorded in selected_parameters.json); waves
+                # without a recorded index are left untouched. Losing combo
+                # directories are collected first (scandir entries cache the
+                # dir check), then deleted concurrently since removing large
+                # trees is dominated by unlink latency
+                victims = []
+                for wave_name, params in wave_params_map.items():
+                    keep_index = (params.get("sweep_meta") or {}).get("index")
+                    if not isinstance(keep_index, int):
+                        print(f"  No selected combo recorded for {wave_name}; skipping")
+                        continue
+                    keep_name = f"sweep_{keep_index:04d}"
+                    try:
+                        combos = os.scandir(optimize_dir / wave_name / "combos")
+                    except (FileNotFoundError, NotADirectoryError):
                         continue
+                    with combos:
+                        victims.extend(
+                            combo
+                            for combo in combos
+                            if combo.name.startswith("sweep_")
+                            and combo.name != keep_name
+                            and combo.is_dir()
+                        )
 
-                    for combo_dir in combos_dir.iterdir():
-                        if not combo_dir.is_dir() or not combo_dir.name.startswith(
-                            "sweep_"
-                        ):
-                            continue
-
-                        # Check if this is the winning combo
-                        combo_name = combo_dir.name
-                        # Extract atlas and metric from directory name (format: sweep_<atlas>_<metric>_<hash>)
-                        parts = combo_name.replace("sweep_", "").split("_")
-                        if len(parts) >= 2:
-                            combo_key = f"{parts[0]}_{parts[1]}"
-                            if combo_key != best_combo_key:
-                                try:
-                                    shutil.rmtree(combo_dir)
-                                    pruned_count += 1
-                                except Exception as e:
-                                    print(f"  Could not remove {combo_dir.name}: {e}")
+                def _remove(combo):
+                    try:
+                        shutil.rmtree(combo.path)
+                    except Exception as e:
+                        print(f"  Could not remove {combo.name}: {e}")
+                        return False
+                    return True
+
+                pruned_count = 0
+                if victims:
+                    with ThreadPoolExecutor(max_workers=min(16, len(victims))) as pool:
+                        pruned_count = sum(pool.map(_remove, victims))
 
                 print(f" Pruned {pruned_count} non-optimal combination directories")
                 print(" Disk space saved!")
@@ -570,16 +815,21 @@ Advanced:
             print(f" Input path is not a valid file or directory: {input_path}")
             return 1
 
+    # Every command past review launches child processes; they all share one
+    # environment (Qt offscreen, DSI Studio path) built here
+    import subprocess
+
+    env = propagate_no_emoji()
+
     if args.command == "sweep":
+        import uuid
+
         # Run full setup validation unless opted out
+        setup_proc = None
         if not getattr(args, "no_validation", False):
-            validate_script = str(scripts_dir / "validate_setup.py")
+            validate_script = os.path.join(scripts_dir, "validate_setup.py")
             # Try to auto-detect config and input for validation
-            config_path = (
-                args.config
-                or args.extraction_config
-                or str(root / "configs" / "braingraph_default_config.json")
-            )
+            config_path = args.config or args.extraction_config or default_config_path
             input_path = args.data_dir
             output_path = args.output_dir
             val_args = [
@@ -592,59 +842,90 @@ Advanced:
                 "--test-input",
                 input_path,
             ]
-            result = subprocess.run(val_args, capture_output=True, text=True)
-            print(result.stdout)
-            if result.returncode != 0:
-                print(" Full setup validation failed. Exiting.")
-                sys.exit(1)
-        # Append UUID to output directory
-        unique_id = str(uuid.uuid4())
-        sweep_output_dir = f"{_abs(args.output_dir)}/sweep-{unique_id}"
-        cmd = [
-            sys.executable,
-            str(scripts_dir / "cross_validation_bootstrap_optimizer.py"),
-            "--data-dir",
-            _abs(args.data_dir),
-            "--output-dir",
-            sweep_output_dir,
-        ]
+            # Runs in the background while the JSON configs are checked below,
+            # writing its report straight to the terminal
+            setup_proc = subprocess.Popen(val_args)
+        try:
+            # Append UUID to output directory
+            unique_id = str(uuid.uuid4())
+            sweep_output_dir = f"{_abs(args.output_dir)}/sweep-{unique_id}"
+            cmd = [
+                sys.executable,
+                os.path.join(scripts_dir, "cross_validation_bootstrap_optimizer.py"),
+                "--data-dir",
+                _abs(args.data_dir),
+                "--output-dir",
+                sweep_output_dir,
+            ]
 
-        # Decide how to interpret provided configuration flags
-        chosen_extraction_cfg: str | None = None
-        chosen_master_cfg: str | None = None
-        if args.quick:
-            # Quick demo should use the tiny micro sweep to avoid large grids
-            chosen_extraction_cfg = str(root / "configs" / "sweep_micro.json")
-        if args.extraction_config:
-            chosen_extraction_cfg = _abs(args.extraction_config)
-        if args.config:
-            try:
-                import json as _json
-
-                _cfg_path = Path(args.config)
-                cfg_txt = _cfg_path.read_text()
-                cfg_json = _json.loads(cfg_txt)
-                is_master = any(
-                    k in cfg_json
-                    for k in ("wave1_config", "wave2_config", "bootstrap_optimization")
+            # Decide how to interpret provided configuration flags
+            chosen_extraction_cfg: str | None = None
+            chosen_master_cfg: str | None = None
+            if args.quick:
+                # Quick demo should use the tiny micro sweep to avoid large grids
+                chosen_extraction_cfg = os.path.join(
+                    root, "configs", "sweep_micro.json"
                 )
-                is_extraction_like = any(
-                    k in cfg_json
-                    for k in ("atlases", "connectivity_values", "sweep_parameters")
-                )
-                if is_master and not is_extraction_like:
-                    chosen_master_cfg = _abs(args.config)
-                else:
-                    chosen_extraction_cfg = _abs(args.config)
-            except Exception:
-                chosen_extraction_cfg = _abs(args.config)
+            if args.extraction_config:
+                chosen_extraction_cfg = _abs(args.extraction_config)
+            if args.config:
+                # The parse cache is keyed on the path string, so classification
+                # and the validator below must both see the same absolute path
+                config_abs = _abs(args.config)
+                try:
+                    # Same cached parse the validator below reuses
+                    from scripts.json_validator import load_json_config
 
-        # Validate configs before running sweep
+                    cfg_json = load_json_config(config_abs)
+                    is_master = any(
+                        k in cfg_json
+                        for k in (
+                            "wave1_config",
+                            "wave2_config",
+                            "bootstrap_optimization",
+                        )
+                    )
+                    is_extraction_like = any(
+                        k in cfg_json
+                        for k in ("atlases", "connectivity_values", "sweep_parameters")
+                    )
+                    if is_master and not is_extraction_like:
+                        chosen_master_cfg = config_abs
+                    else:
+                        chosen_extraction_cfg = config_abs
+                except Exception:
+                    chosen_extraction_cfg = config_abs
+
+            # Validate configs before running sweep; their report is held back so
+            # it still prints after the setup validation's output
+            import contextlib
+            import io
+
+            config_report = io.StringIO()
+            configs_ok = True
+            with contextlib.redirect_stdout(config_report):
+                for cfg in (chosen_master_cfg, chosen_extraction_cfg):
+                    if cfg and configs_ok:
+                        configs_ok = check_json_config(cfg)
+            if setup_proc is not None:
+                setup_proc.wait()
+        finally:
+            # Do not leave the validator running when the checks above raise
+            # or are interrupted; a no-op once it has been waited for
+            if setup_proc is not None:
+                terminate_process(setup_proc)
+        if setup_proc is not None:
+            print()
+            if setup_proc.returncode != 0:
+                print(" Full setup validation failed. Exiting.")
+                sys.exit(1)
+        print(config_report.getvalue(), end="")
+        if not configs_ok:
+            print("Config validation failed. Exiting.")
+            sys.exit(1)
         if chosen_master_cfg:
-            validate_json_config(chosen_master_cfg)
             cmd += ["--config", chosen_master_cfg]
         if chosen_extraction_cfg:
-            validate_json_config(chosen_extraction_cfg)
             cmd += ["--extraction-config", chosen_extraction_cfg]
 
         if args.subjects:
@@ -653,6 +934,8 @@ Advanced:
             cmd += ["--max-parallel", str(int(args.max_parallel))]
         if args.verbose:
             cmd += ["--verbose"]
+        if args.prune_nonbest:
+            cmd.append("--prune-nonbest")
         if no_emoji:
             cmd.append("--no-emoji")
         if chosen_extraction_cfg:
@@ -661,28 +944,44 @@ Advanced:
             print(f" Using master optimizer config: {chosen_master_cfg}")
         print(f" Running: {' '.join(cmd)}")
         print(f" Sweep output directory: {sweep_output_dir}")
-        env = propagate_no_emoji()
         try:
-            subprocess.run(cmd, check=True, env=env)
+            _run_child(cmd, env)
             print(" Parameter sweep completed successfully!")
             print(f" Results saved to: {sweep_output_dir}/optimize")
 
             if not getattr(args, "no_report", False):
-                # Autodetect network measures directory for quick quality check
-                import glob
+                # One pass over the wave directories finds both the network
+                # measures for the quick quality check and the diagnostics
+                # for the Pareto report (opt_dir is already absolute, so
+                # scandir paths need no resolve())
+                opt_dir = Path(sweep_output_dir) / "optimize"
+                try:
+                    with os.scandir(opt_dir) as it:
+                        entries = [e for e in it if e.is_dir()]
+                except FileNotFoundError:
+                    entries = []
+                # Hidden directories are skipped, as glob's "*" would
+                selection_dirs = [
+                    os.path.join(e.path, "03_selection")
+                    for e in entries
+                    if not e.name.startswith(".")
+                    and os.path.exists(os.path.join(e.path, "03_selection"))
+                ]
+                wave_dirs = [
+                    e.path
+                    for e in entries
+                    if os.path.exists(os.path.join(e.path, "combo_diagnostics.csv"))
+                ]
 
-                selection_dirs = glob.glob(
-                    f"{sweep_output_dir}/optimize/*/03_selection"
-                )
+                # Autodetect network measures directory for quick quality check
                 if selection_dirs:
                     matrices_dir = selection_dirs[0]
                     print(f" Running quick quality check on: {matrices_dir}")
-                    qqc_script = str(root / "scripts" / "quick_quality_check.py")
+                    qqc_script = os.path.join(scripts_dir, "quick_quality_check.py")
                     qqc_args = [sys.executable, qqc_script, matrices_dir]
-                    qqc_result = subprocess.run(
-                        qqc_args, capture_output=True, text=True
-                    )
-                    print(qqc_result.stdout)
+                    # Stream the report instead of buffering it until exit
+                    qqc_result = subprocess.run(qqc_args)
+                    print()
                     if qqc_result.returncode != 0:
                         print("  Quick quality check reported issues!")
                 else:
@@ -691,17 +990,12 @@ Advanced:
                     )
 
                 # Always run Pareto report if any wave diagnostics exist
-                opt_dir = Path(sweep_output_dir) / "optimize"
                 optimization_results_dir = opt_dir / "optimization_results"
                 optimization_results_dir.mkdir(parents=True, exist_ok=True)
-                wave_dirs = []
-                for child in opt_dir.iterdir():
-                    if child.is_dir() and (child / "combo_diagnostics.csv").exists():
-                        wave_dirs.append(str(child.resolve()))
                 if wave_dirs:
                     pareto_cmd = [
                         sys.executable,
-                        str(root / "scripts" / "pareto_view.py"),
+                        os.path.join(scripts_dir, "pareto_view.py"),
                         *wave_dirs,
                         "-o",
                         str(optimization_results_dir),
@@ -709,7 +1003,7 @@ Advanced:
                     ]
                     print(f" Generating Pareto report: {' '.join(pareto_cmd)}")
                     try:
-                        subprocess.run(pareto_cmd, check=True, env=env)
+                        _run_child(pareto_cmd, env)
                         print(f" Pareto report written to: {optimization_results_dir}")
                     except subprocess.CalledProcessError as e:
                         print(
@@ -740,12 +1034,12 @@ Advanced:
                     wave2_dir = optimize_dir / "bootstrap_qa_wave_2"
                     cmd_agg = [
                         sys.executable,
-                        str(root / "scripts" / "aggregate_wave_candidates.py"),
+                        os.path.join(scripts_dir, "aggregate_wave_candidates.py"),
                         str(optimization_results_dir),
                         str(wave1_dir),
                         str(wave2_dir),
                     ]
-                    subprocess.run(cmd_agg, check=True)
+                    _run_child(cmd_agg)
                     top3 = optimization_results_dir / "top3_candidates.json"
                     print(f" Auto-selected top 3 candidates: {top3}")
                     print(
@@ -785,40 +1079,21 @@ Advanced:
 
         out_selected = Path(args.output_dir) / "selected"
         if isinstance(cfg_json, list):
-            # Rank choices and pick candidate
-            def score(obj):
-                for k in ("average_score", "score", "pure_qa_score", "quality_score"):
-                    v = obj.get(k)
-                    if isinstance(v, (int, float)):
-                        return float(v)
-                pw = obj.get("per_wave")
-                if isinstance(pw, list):
-                    vals = [
-                        w.get("score")
-                        for w in pw
-                        if isinstance(w, dict)
-                        and isinstance(w.get("score"), (int, float))
-                    ]
-                    if vals:
-                        return float(sum(vals) / len(vals))
-                return 0.0
+            # Pick the n-th best candidate without sorting the whole list
+            import heapq
 
-            ranked = sorted(cfg_json, key=score, reverse=True)
-            idx = max(1, min(args.candidate_index, len(ranked))) - 1
-            chosen = ranked[idx]
+            n = max(1, min(args.candidate_index, len(cfg_json)))
+            if n == 1:
+                chosen = max(cfg_json, key=_candidate_score)
+            else:
+                chosen = heapq.nlargest(n, cfg_json, key=_candidate_score)[-1]
 
             # Resolve DSI Studio command
             dsi_cmd = os.environ.get("DSI_STUDIO_CMD")
-            if (
-                not dsi_cmd
-                and (root / "configs" / "braingraph_default_config.json").exists()
-            ):
+            if not dsi_cmd and os.path.exists(default_config_path):
                 try:
-                    default_cfg = json.loads(
-                        (
-                            root / "configs" / "braingraph_default_config.json"
-                        ).read_text()
-                    )
+                    with open(default_config_path) as f:
+                        default_cfg = json.load(f)
                     dsi_cmd = default_cfg.get("dsi_studio_cmd")
                 except Exception:
                     dsi_cmd = None
@@ -880,7 +1155,7 @@ Advanced:
 
             cmd = [
                 sys.executable,
-                str(root / "scripts" / "run_pipeline.py"),
+                os.path.join(scripts_dir, "run_pipeline.py"),
                 "--data-dir",
                 _abs(args.data_dir),
                 "--output",
@@ -901,8 +1176,8 @@ Advanced:
         else:
             # Treat as Bayesian optimization result, loading defaults and merging
             # optimal parameters on top.
-            default_cfg_path = root / "configs" / "braingraph_default_config.json"
-            if not default_cfg_path.exists():
+            default_cfg_path = default_config_path
+            if not os.path.exists(default_cfg_path):
                 print(f" Default config not found at: {default_cfg_path}")
                 return 1
 
@@ -945,7 +1220,7 @@ Advanced:
 
             cmd = [
                 sys.executable,
-                str(root / "scripts" / "run_pipeline.py"),
+                os.path.join(scripts_dir, "run_pipeline.py"),
                 "--extraction-config",
                 str(final_config_path),
                 "--data-dir",
@@ -971,9 +1246,8 @@ Advanced:
             validate_json_config(_abs(args.optimal_config))
 
         print(f" Running: {' '.join(cmd)}")
-        env = propagate_no_emoji()
         try:
-            subprocess.run(cmd, check=True, env=env)
+            _run_child(cmd, env)
             print(" Complete analysis finished successfully!")
             print(f" Results available in: {out_selected}")
             return 0
@@ -982,7 +1256,7 @@ Advanced:
             return e.returncode
 
     if args.command == "pipeline":
-        cmd = [sys.executable, str(root / "scripts" / "run_pipeline.py")]
+        cmd = [sys.executable, os.path.join(scripts_dir, "run_pipeline.py")]
         config_path = None
         if args.step:
             cmd += ["--step", args.step]
@@ -994,7 +1268,7 @@ Advanced:
             config_path = _abs(args.config)
             cmd += ["--extraction-config", config_path]
         else:
-            config_path = str(root / "configs" / "braingraph_default_config.json")
+            config_path = default_config_path
             cmd += ["--extraction-config", config_path]
         if args.data_dir:
             cmd += ["--data-dir", _abs(args.data_dir)]
@@ -1010,9 +1284,15 @@ Advanced:
             validate_json_config(config_path)
 
         print(f" Running: {' '.join(cmd)}")
-        env = propagate_no_emoji()
+        if os.name == "posix" and not os.environ.get("OPTICONN_NO_EXEC"):
+            # run_pipeline.py reports its own success/failure, so hand the
+            # process over to it instead of forking and waiting
+            # (OPTICONN_NO_EXEC=1 keeps the hub as a waiting parent)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execve(sys.executable, cmd, env)
         try:
-            subprocess.run(cmd, check=True, env=env)
+            _run_child(cmd, env)
             print(" Pipeline execution completed!")
             return 0
         except subprocess.CalledProcessError as e:
@@ -1023,7 +1303,7 @@ Advanced:
         # Run Bayesian optimization
         cmd = [
             sys.executable,
-            str(root / "scripts" / "bayesian_optimizer.py"),
+            os.path.join(scripts_dir, "bayesian_optimizer.py"),
             "-i",
             _abs(args.data_dir),
             "-o",
@@ -1051,9 +1331,8 @@ Advanced:
         if args.max_workers > 1:
             print(f"   Workers: {args.max_workers} (parallel execution)")
 
-        env = propagate_no_emoji()
         try:
-            subprocess.run(cmd, check=True, env=env)
+            _run_child(cmd, env)
             print(" Bayesian optimization completed!")
             print(f"\n Results available in: {args.output_dir}")
             print("\n Next: Apply the best parameters with 'opticonn apply'")
@@ -1066,7 +1345,7 @@ Advanced:
         # Run sensitivity analysis
         cmd = [
             sys.executable,
-            str(root / "scripts" / "sensitivity_analyzer.py"),
+            os.path.join(scripts_dir, "sensitivity_analyzer.py"),
             "-i",
             _abs(args.data_dir),
             "-o",
@@ -1091,9 +1370,8 @@ Advanced:
         else:
             print("   Parameters: All")
 
-        env = propagate_no_emoji()
         try:
-            subprocess.run(cmd, check=True, env=env)
+            _run_child(cmd, env)
             print(" Sensitivity analysis completed!")
             print(f"\n Results available in: {args.output_dir}")
             print("   - sensitivity_analysis_results.json")
@@ -1103,6 +1381,66 @@ Advanced:
             print(f" Sensitivity analysis failed with error code {e.returncode}")
             return e.returncode
 
+    if args.command == "batch":
+        import json
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        try:
+            raw_jobs = json.loads(Path(args.jobs).read_text())
+        except Exception as e:
+            print(f" Could not read job list {args.jobs}: {e}")
+            return 1
+
+        jobs = []
+        for n, job in enumerate(raw_jobs if isinstance(raw_jobs, list) else [], 1):
+            job_args = job.get("args") if isinstance(job, dict) else job
+            priority = job.get("priority", 0) if isinstance(job, dict) else 0
+            if (
+                not isinstance(job_args, list)
+                or not job_args
+                or not all(isinstance(a, str) for a in job_args)
+            ):
+                print(f" Job {n} in {args.jobs} is not a list of arguments")
+                return 1
+            if job_args[0] == "batch":
+                print(f" Job {n} in {args.jobs} cannot itself be a batch")
+                return 1
+            if isinstance(priority, bool) or not isinstance(priority, (int, float)):
+                print(f" Job {n} in {args.jobs} has a non-numeric priority")
+                return 1
+            jobs.append((priority, job_args))
+        if not jobs:
+            print(f" No jobs found in {args.jobs}")
+            return 1
+        # Stable sort keeps file order among equal priorities
+        jobs.sort(key=lambda job: job[0], reverse=True)
+
+        # Each job is its own opticonn process, so threads are enough to
+        # keep max_workers of them running
+        hub_script = os.path.join(scripts_dir, "opticonn_hub.py")
+
+        def run_job(job_args):
+            cmd = [sys.executable, hub_script, *job_args]
+            return subprocess.run(cmd, env=env, close_fds=False).returncode
+
+        print(f" Running {len(jobs)} job(s) with {args.max_workers} worker(s)")
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as pool:
+            futures = {pool.submit(run_job, job_args): job_args for _, job_args in jobs}
+            for fut in as_completed(futures):
+                try:
+                    rc = fut.result()
+                    status = "done" if rc == 0 else f"failed with error code {rc}"
+                except OSError as e:
+                    rc, status = 1, f"could not be started: {e}"
+                print(f" opticonn {' '.join(futures[fut])}: {status}")
+                failed += rc != 0
+        if failed:
+            print(f" {failed}/{len(jobs)} job(s) failed")
+            return 1
+        print(" All batch jobs completed!")
+        return 0
+
     print("Unknown command")
     return 1
 
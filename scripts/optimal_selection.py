@@ -1041,16 +1041,37 @@ def main():
     root_logger.addHandler(fh)
     root_logger.addHandler(ch)
 
+    return run(
+        args.optimization_file,
+        args.output_dir,
+        config_path=args.config,
+        plots=args.plots,
+    )
+
+
+def run(
+    optimization_file: str,
+    output_dir: str,
+    config_path: Optional[str] = None,
+    plots: bool = False,
+) -> int:
+    """Run Step 03 on an optimized-metrics CSV and write results to ``output_dir``.
+
+    Importable entry point used by ``main()`` and by callers that want to
+    avoid spawning a new interpreter. Returns a process-style exit code.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
     # Load configuration
     config = None
-    if args.config and Path(args.config).exists():
-        with open(args.config, "r") as f:
+    if config_path and Path(config_path).exists():
+        with open(config_path, "r") as f:
             config = json.load(f).get("optimal_selection", {})
 
     try:
         # Initialize selector and load data
         selector = OptimalSelector(config)
-        df = selector.load_optimization_results(args.optimization_file)
+        df = selector.load_optimization_results(optimization_file)
 
         # Select optimal combinations
         optimal_combinations = selector.select_optimal_combinations(df)
@@ -1070,19 +1091,17 @@ def main():
             print("  1. The optimization results file is empty or malformed")
             print("  2. All combinations were filtered out (check 'recommended' flags)")
             print("  3. Quality scores are missing or invalid")
-            print(
-                f"\nPlease review the optimization results file: {args.optimization_file}"
-            )
+            print(f"\nPlease review the optimization results file: {optimization_file}")
             return 1
 
         # Prepare datasets for scientific analysis
         prepared_files = selector.prepare_scientific_dataset(
-            df, optimal_combinations, args.output_dir
+            df, optimal_combinations, output_dir
         )
 
         # Try to discover selected parameters (e.g., from cross-validation wave root)
         try:
-            out_dir_path = Path(args.output_dir)
+            out_dir_path = Path(output_dir)
             wave_root = (
                 out_dir_path.parent
                 if out_dir_path.name == "03_selection"
@@ -1122,18 +1141,18 @@ def main():
             pass
 
         # Create summary report
-        summary_file = Path(args.output_dir) / "optimal_selection_summary.txt"
+        summary_file = Path(output_dir) / "optimal_selection_summary.txt"
         selector.create_selection_summary(optimal_combinations, str(summary_file))
 
         # Create plots if requested
-        if args.plots:
+        if plots:
             plot_files = selector.create_selection_plots(
-                optimal_combinations, args.output_dir
+                optimal_combinations, output_dir
             )
             logger.info(f"Generated {len(plot_files)} selection plots")
 
         # Save optimal combinations as JSON for programmatic use
-        combinations_file = Path(args.output_dir) / "optimal_combinations.json"
+        combinations_file = Path(output_dir) / "optimal_combinations.json"
         with open(combinations_file, "w") as f:
             json.dump(optimal_combinations, f, indent=2)
 
@@ -1142,7 +1161,7 @@ def main():
         print(f"{'='*50}")
         print(f"Selected {len(optimal_combinations)} optimal combinations")
         print(f"Prepared {len(prepared_files)} analysis-ready datasets")
-        print(f"Results saved to: {args.output_dir}")
+        print(f"Results saved to: {output_dir}")
         print("\nTop 3 recommendations:")
 
         sorted_combos = sorted(
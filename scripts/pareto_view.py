@@ -219,6 +219,10 @@ def main() -> int:
 
     if args.plot:
         try:
+            import matplotlib
+
+            # Only a PNG is written; skip interactive backend discovery
+            matplotlib.use("Agg")
             import matplotlib.pyplot as plt
 
             plt.figure(figsize=(7.5, 5.5))
@@ -13,10 +13,12 @@ Hilfsfunktionen für Parameter-Sweeps:
 
 from __future__ import annotations
 
+import json
 import math
-import random
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
 
 def _is_float(x: str) -> bool:
     try:
@@ -88,18 +90,8 @@ def grid_product(param_values: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
     return combos
 
 
-def random_sampling(
-    param_values: Dict[str, List[Any]], n_samples: int, seed: int = 42
-) -> List[Dict[str, Any]]:
-    """Random sampling across provided discrete value lists.
-    Assumes each param has a discrete set (already expanded list)."""
-    rng = random.Random(seed)
-    keys = list(param_values.keys())
-    combos = []
-    for _ in range(max(1, n_samples)):
-        choice = {k: rng.choice(param_values[k]) for k in keys if param_values[k]}
-        combos.append(choice)
-    # Deduplicate while preserving order
+def _dedupe_combos(combos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop duplicate combinations while preserving order."""
     seen = set()
     unique = []
     for c in combos:
@@ -110,6 +102,31 @@ def random_sampling(
     return unique
 
 
+def _combos_from_indices(
+    param_values: Dict[str, List[Any]], keys: List[str], idx: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Materialize an (n_samples, n_params) level-index matrix as dicts."""
+    return [{k: param_values[k][j] for k, j in zip(keys, row)} for row in idx.tolist()]
+
+
+def random_sampling(
+    param_values: Dict[str, List[Any]], n_samples: int, seed: int = 42
+) -> List[Dict[str, Any]]:
+    """Random sampling across provided discrete value lists.
+    Assumes each param has a discrete set (already expanded list).
+
+    All level indices are drawn in one call from ``numpy.random.default_rng``.
+    """
+    rng = np.random.default_rng(seed)
+    keys = [k for k in param_values.keys() if param_values[k]]
+    n = max(1, n_samples)
+    if not keys:
+        return [{}]
+    sizes = [len(param_values[k]) for k in keys]
+    idx = rng.integers(0, sizes, size=(n, len(keys)))
+    return _dedupe_combos(_combos_from_indices(param_values, keys, idx))
+
+
 def lhs_sampling(
     param_values: Dict[str, List[Any]], n_samples: int, seed: int = 42
 ) -> List[Dict[str, Any]]:
@@ -117,41 +134,20 @@ def lhs_sampling(
 
     Strategy: For each dim, shuffle indices and map ranks to available discrete levels.
     This is an approximation suitable when continuous ranges have already
-    been discretized via expand_range.
+    been discretized via expand_range. All dimensions are permuted in a
+    single ``Generator.permuted`` call.
     """
-    rng = random.Random(seed)
-    keys = list(param_values.keys())
+    rng = np.random.default_rng(seed)
+    keys = [k for k in param_values.keys() if param_values[k]]
     n = max(1, n_samples)
-    # Build per-dimension index sequences
-    index_sequences = {}
-    for k in keys:
-        m = max(1, len(param_values[k]))
-        # Create n ranks and map to m levels
-        ranks = list(range(n))
-        rng.shuffle(ranks)
-        # Map each rank to nearest level index
-        idxs = [min(int(round(r / max(1, n - 1) * (m - 1))), m - 1) for r in ranks]
-        index_sequences[k] = idxs
-
-    combos = []
-    for i in range(n):
-        choice = {}
-        for k in keys:
-            vals = param_values[k]
-            if not vals:
-                continue
-            idx = index_sequences[k][i % len(index_sequences[k])]
-            choice[k] = vals[idx]
-        combos.append(choice)
-    # Deduplicate
-    seen = set()
-    unique = []
-    for c in combos:
-        key = tuple((k, c[k]) for k in sorted(c.keys()))
-        if key not in seen:
-            seen.add(key)
-            unique.append(c)
-    return unique
+    if not keys:
+        return [{}]
+    # One row of shuffled ranks 0..n-1 per dimension
+    ranks = rng.permuted(np.tile(np.arange(n), (len(keys), 1)), axis=1)
+    # Map each rank to nearest level index
+    levels = np.array([len(param_values[k]) for k in keys])[:, None]
+    idx = np.minimum(np.rint(ranks / max(1, n - 1) * (levels - 1)), levels - 1)
+    return _dedupe_combos(_combos_from_indices(param_values, keys, idx.astype(int).T))
 
 
 def build_param_grid_from_config(
@@ -210,10 +206,13 @@ def build_param_grid_from_config(
 def apply_param_choice_to_config(
     base_cfg: Dict[str, Any], choice: Dict[str, Any], mapping: Dict[str, str]
 ) -> Dict[str, Any]:
-    """Create a derived config dict with choice applied according to mapping."""
-    import copy
+    """Create a derived config dict with choice applied according to mapping.
 
-    cfg = copy.deepcopy(base_cfg)
+    Only the dicts along each mapped path are copied; untouched subtrees are
+    shared with ``base_cfg``, which is never modified.
+    """
+    cfg = dict(base_cfg)
+    copied = {id(cfg)}
     for logical_name, value in choice.items():
         target = mapping.get(logical_name)
         if not target:
@@ -221,8 +220,44 @@ def apply_param_choice_to_config(
         path = target.split(".")
         cur = cfg
         for key in path[:-1]:
-            if key not in cur or not isinstance(cur[key], dict):
-                cur[key] = {}
-            cur = cur[key]
+            nxt = cur.get(key)
+            if not isinstance(nxt, dict):
+                nxt = {}
+            elif id(nxt) not in copied:
+                nxt = dict(nxt)
+            copied.add(id(nxt))
+            cur[key] = nxt
+            cur = nxt
         cur[path[-1]] = value
     return cfg
+
+
+# Every manifest line starts with this prefix, so load_sweep_config can find
+# an entry without parsing the other lines; writer and reader both use it
+_MANIFEST_LINE_PREFIX = '{{"index":{index},"cfg":'
+
+
+def write_sweep_manifest(path: Any, configs: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """Write derived sweep configs as a JSONL manifest, one ``{"index", "cfg"}`` per line.
+
+    The manifest is machine-only, so lines are written in compact form.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for index, cfg in configs:
+            f.write(_MANIFEST_LINE_PREFIX.format(index=int(index)))
+            f.write(json.dumps(cfg, separators=(",", ":")))
+            f.write("}\n")
+
+
+def load_sweep_config(path: Any, index: int) -> Dict[str, Any]:
+    """Return the derived config stored for ``index`` in a sweep manifest.
+
+    Only the matching line is parsed; lines are matched on the
+    ``_MANIFEST_LINE_PREFIX`` written by :func:`write_sweep_manifest`.
+    """
+    prefix = _MANIFEST_LINE_PREFIX.format(index=int(index))
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(prefix):
+                return json.loads(line)["cfg"]
+    raise KeyError(f"Sweep index {index} not found in {path}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the sweep candidate selection of ``opticonn review`` on a synthetic
+two-wave optimize/ tree.
+"""
+
+import json
+import sys
+
+from scripts import opticonn_hub
+
+
+def _write_wave(optimize_dir, wave_name, candidates, params=None):
+    selection_dir = optimize_dir / wave_name / "03_selection"
+    selection_dir.mkdir(parents=True)
+    (selection_dir / "optimal_combinations.json").write_text(json.dumps(candidates))
+    if params is not None:
+        (optimize_dir / wave_name / "selected_parameters.json").write_text(
+            json.dumps({"selected_config": params})
+        )
+
+
+def _review(optimize_dir, monkeypatch, *extra_args):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["opticonn", "review", "-i", str(optimize_dir), "--no-emoji", *extra_args],
+    )
+    assert opticonn_hub.main() == 0
+    selected = json.loads((optimize_dir / "selected_candidate.json").read_text())
+    assert len(selected) == 1
+    return selected[0]
+
+
+def test_review_selects_best_consistent_candidate(tmp_path, monkeypatch):
+    optimize_dir = tmp_path / "optimize"
+    _write_wave(
+        optimize_dir,
+        "wave1",
+        [
+            {"atlas": "AAL3", "connectivity_metric": "count", "pure_qa_score": 0.25},
+            {
+                "atlas": "Brainnectome",
+                "connectivity_metric": "fa",
+                "pure_qa_score": 0.5,
+            },
+            # Highest score overall, but missing from wave2
+            {"atlas": "HCP-MMP", "connectivity_metric": "qa", "pure_qa_score": 0.95},
+        ],
+        params={
+            "tracking_parameters": {"fa_threshold": 0.1, "min_length": 10},
+            "sweep_meta": {"choice": {"tract_count": 5000, "min_length": 30}},
+        },
+    )
+    _write_wave(
+        optimize_dir,
+        "wave2",
+        [
+            {"atlas": "AAL3", "connectivity_metric": "count", "pure_qa_score": 0.75},
+            # NaN scores are skipped in the average, leaving Brainnectome/fa
+            # tied with AAL3/count at 0.5; the first-seen key wins the tie
+            {
+                "atlas": "Brainnectome",
+                "connectivity_metric": "fa",
+                "pure_qa_score": float("nan"),
+            },
+        ],
+    )
+
+    best = _review(optimize_dir, monkeypatch)
+
+    assert best["atlas"] == "AAL3"
+    assert best["connectivity_metric"] == "count"
+    assert best["candidate_key"] == "AAL3_count"
+    assert best["waves_present"] == 2
+    assert best["avg_qa"] == 0.5
+    assert best["wave"] == "wave1"
+    assert best["tract_count"] == 5000
+    assert best["tracking_parameters"] == {
+        "fa_threshold": 0.1,
+        "min_length": 30,
+        "tract_count": 5000,
+    }
+
+
+def test_review_falls_back_to_best_overall_score(tmp_path, monkeypatch):
+    optimize_dir = tmp_path / "optimize"
+    _write_wave(
+        optimize_dir,
+        "wave1",
+        [{"atlas": "AAL3", "connectivity_metric": "count", "pure_qa_score": 0.25}],
+    )
+    _write_wave(
+        optimize_dir,
+        "wave2",
+        [
+            {
+                "atlas": "Brainnectome",
+                "connectivity_metric": "fa",
+                "pure_qa_score": 0.75,
+            },
+            {"atlas": "HCP-MMP", "connectivity_metric": "qa", "pure_qa_score": 0.75},
+        ],
+    )
+
+    best = _review(optimize_dir, monkeypatch)
+
+    assert best["atlas"] == "Brainnectome"
+    assert best["connectivity_metric"] == "fa"
+    assert best["waves_present"] == 1
+    assert best["wave"] == "wave2"
+    assert "avg_qa" not in best
+
+
+def test_review_prune_keeps_each_waves_selected_combo(tmp_path, monkeypatch):
+    optimize_dir = tmp_path / "optimize"
+    candidate = {"atlas": "AAL3", "connectivity_metric": "count", "pure_qa_score": 0.5}
+    _write_wave(optimize_dir, "wave1", [candidate], params={"sweep_meta": {"index": 2}})
+    # No selected_parameters.json: the wave's combos must not be touched
+    _write_wave(optimize_dir, "wave2", [candidate])
+    for wave_name in ("wave1", "wave2"):
+        for i in (1, 2, 3):
+            (optimize_dir / wave_name / "combos" / f"sweep_{i:04d}").mkdir(parents=True)
+
+    _review(optimize_dir, monkeypatch, "--prune-nonbest")
+
+    assert sorted(p.name for p in (optimize_dir / "wave1" / "combos").iterdir()) == [
+        "sweep_0002"
+    ]
+    assert len(list((optimize_dir / "wave2" / "combos").iterdir())) == 3
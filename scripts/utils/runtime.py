@@ -6,9 +6,13 @@ Provides helpers to keep console output resilient across platforms.
 from __future__ import annotations
 
 import os
+import signal
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import subprocess
 
 
 def configure_stdio(no_emoji: Optional[bool] = None) -> bool:
@@ -96,3 +100,58 @@ def propagate_no_emoji(env: Optional[dict[str, str]] = None) -> dict[str, str]:
     if "DSI_STUDIO_PATH" in os.environ:
         env["DSI_STUDIO_PATH"] = os.environ["DSI_STUDIO_PATH"]
     return env
+
+
+def terminate_process(proc: subprocess.Popen, timeout: float = 5.0) -> None:
+    """Stop a child process that is still running.
+
+    Sends SIGTERM to the child's process group when it leads one (started
+    with ``start_new_session=True``) so grandchildren such as DSI Studio are
+    stopped too; escalates to a kill after ``timeout`` seconds.
+    """
+    import subprocess
+
+    if proc.poll() is not None:
+        return
+    group = os.name == "posix" and _leads_process_group(proc.pid)
+    try:
+        if group:
+            os.killpg(proc.pid, signal.SIGTERM)
+        else:
+            proc.terminate()
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            if group:
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except OSError:
+            pass
+        proc.wait()
+    except OSError:
+        pass
+
+
+def exit_on_termination_signals() -> None:
+    """Turn SIGTERM and SIGHUP into ``SystemExit`` in the calling process.
+
+    Children started with ``start_new_session=True`` are outside the
+    terminal's process group, so ``kill <pid>`` or closing the terminal only
+    reaches the parent; exiting through ``SystemExit`` lets the ``finally``
+    blocks around those children run ``terminate_process`` on them.
+    """
+
+    def _exit(signum, frame):
+        raise SystemExit(128 + signum)
+
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _exit)
+
+
+def _leads_process_group(pid: int) -> bool:
+    try:
+        return os.getpgid(pid) == pid
+    except OSError:
+        return False